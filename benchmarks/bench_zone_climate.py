@@ -0,0 +1,200 @@
+"""Replay synthetic sensor storms against Zone Climate.
+
+Builds one hub entry with N zones of M TRVs each on top of fake_hass,
+adds the climate and sensor entities of every zone, then fires random
+temperature reports at a fixed rate (or as fast as possible) and reports
+throughput, event-to-state-write latency, service calls and retained memory.
+
+Run from the repository root, with Home Assistant installed:
+
+    python -m benchmarks.bench_zone_climate --zones 30 --trvs 6 --events 20000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from custom_components.zone_climate import climate, sensor
+from custom_components.zone_climate.const import DOMAIN
+from custom_components.zone_climate.hub import ZoneClimateHub
+
+from .fake_hass import FakeHass, WriteRecorder, install
+
+
+def _build_entry(args) -> SimpleNamespace:
+    """Return a hub config entry with the requested zone layout."""
+    zones = []
+    for z in range(args.zones):
+        zones.append(
+            {
+                "zone_id": f"zone{z}",
+                "zone_name": f"Zone {z}",
+                "zone_temp_sensor": f"sensor.zone{z}_room",
+                "zone_humidity_sensor": f"sensor.zone{z}_room_humidity",
+                "trv_temp_sensors": [f"sensor.zone{z}_trv{t}" for t in range(args.trvs)],
+                "trv_humidity_sensors": [],
+                "primary_heating_control": f"switch.zone{z}_heating",
+                "coalesce_window": args.coalesce_ms,
+                "max_latency": max(args.coalesce_ms * 4, 1000),
+                "control_mode": args.control_mode,
+                "min_on_time": 0,
+                "min_off_time": 0,
+                "temp_aggregation": args.aggregation,
+            }
+        )
+    return SimpleNamespace(
+        entry_id="bench", data={"hub_name": "bench", "zones": zones}, options={}
+    )
+
+
+async def _add_entities(hass, entry, recorder: WriteRecorder):
+    """Set up both platforms and attach the fake state writer."""
+    entities = []
+
+    def add(new_entities, update_before_add=False):
+        entities.extend(new_entities)
+
+    await climate.async_setup_entry(hass, entry, add)
+    await sensor.async_setup_entry(hass, entry, add)
+    for entity in entities:
+        entity.hass = hass
+        entity.entity_id = f"{DOMAIN}.{entity.unique_id}"
+        recorder.attach(
+            entity,
+            entity.coordinator.zone_id,
+            measure=isinstance(entity, climate.ZoneClimate),
+        )
+        await entity.async_added_to_hass()
+    return entities
+
+
+async def run(args) -> dict:
+    """Run one storm and return the measurements."""
+    install()
+    loop = asyncio.get_running_loop()
+    hass = FakeHass(loop)
+    rng = random.Random(args.seed)
+
+    entry = _build_entry(args)
+    readings = {}
+    for zone in entry.data["zones"]:
+        for entity_id in (zone["zone_temp_sensor"], *zone["trv_temp_sensors"]):
+            readings[entity_id] = round(rng.uniform(17, 22), 1)
+            hass.states.async_set(entity_id, str(readings[entity_id]))
+        hass.states.async_set(zone["zone_humidity_sensor"], "50")
+        hass.states.async_set(zone["primary_heating_control"], "off")
+
+    hub = ZoneClimateHub(hass, entry)
+    await hub.async_setup()
+    hass.data[DOMAIN] = {entry.entry_id: hub}
+    recorder = WriteRecorder()
+    entities = await _add_entities(hass, entry, recorder)
+    for entity in entities:
+        if isinstance(entity, climate.ZoneClimate):
+            await entity.async_set_temperature(temperature=20.0)
+            await entity.async_set_hvac_mode("heat")
+    await hass.async_block_till_done()
+
+    sources = list(readings)
+    zone_of = {entity_id: entity_id.split("_")[0].split(".")[1] for entity_id in sources}
+    recorder.writes = 0
+    recorder.latencies.clear()
+    calls_before = hass.services.calls
+
+    # Events are emitted in batches every 10 ms to approximate the rate
+    batch = max(1, round(args.rate / 100)) if args.rate else args.events
+    gc.collect()
+    if args.trace_alloc:
+        tracemalloc.start()
+    # Blocks still held after the run, not a count of allocations made
+    blocks_before = sys.getallocatedblocks()
+    started = time.perf_counter()
+    busy = 0.0
+    sent = 0
+    while sent < args.events:
+        burst_start = time.perf_counter()
+        for _ in range(min(batch, args.events - sent)):
+            entity_id = rng.choice(sources)
+            readings[entity_id] = round(readings[entity_id] + rng.choice((-0.1, 0.1)), 1)
+            recorder.event_sent(zone_of[entity_id])
+            hass.states.async_set(entity_id, str(readings[entity_id]))
+            sent += 1
+        busy += time.perf_counter() - burst_start
+        if args.rate:
+            await asyncio.sleep(0.01)
+        else:
+            await asyncio.sleep(0)
+
+    # Let coalesced pushes and actuator commands drain
+    await asyncio.sleep(args.coalesce_ms / 1000 * 4 + 0.05)
+    await hass.async_block_till_done()
+    elapsed = time.perf_counter() - started
+    blocks_after = sys.getallocatedblocks()
+    peak = None
+    if args.trace_alloc:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    hub.async_stop()
+    for entity in entities:
+        await entity.async_will_remove_from_hass()
+
+    latencies = sorted(recorder.latencies) or [0.0]
+    return {
+        "zones": args.zones,
+        "trvs_per_zone": args.trvs,
+        "events": sent,
+        "elapsed_s": round(elapsed, 3),
+        "events_per_s": round(sent / elapsed),
+        "dispatch_us_per_event": round(busy / sent * 1e6, 2),
+        "latency_p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "latency_p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 3),
+        "state_writes": recorder.writes,
+        "state_writes_per_event": round(recorder.writes / sent, 3),
+        "service_calls": hass.services.calls - calls_before,
+        "retained_blocks_per_event": round((blocks_after - blocks_before) / sent, 3),
+        "peak_traced_kib": round(peak / 1024, 1) if peak is not None else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--zones", type=int, default=30)
+    parser.add_argument("--trvs", type=int, default=4, help="TRVs per zone")
+    parser.add_argument("--events", type=int, default=10000)
+    parser.add_argument(
+        "--rate", type=float, default=0, help="events per second, 0 = unthrottled"
+    )
+    parser.add_argument("--coalesce-ms", type=int, default=0)
+    parser.add_argument(
+        "--control-mode", default="hysteresis", choices=["setpoint", "hysteresis", "pid"]
+    )
+    parser.add_argument("--aggregation", default="mean")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--trace-alloc",
+        action="store_true",
+        help="also trace peak memory (slows the run down considerably)",
+    )
+    parser.add_argument("--json", action="store_true", help="print JSON only")
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(result))
+        return
+    width = max(map(len, result))
+    for key, value in result.items():
+        print(f"{key:<{width}}  {value}")
+
+
+if __name__ == "__main__":
+    main()
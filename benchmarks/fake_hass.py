@@ -0,0 +1,230 @@
+"""Lightweight in-process stand-in for the parts of Home Assistant the
+integration touches at runtime: the state machine, service registry,
+event bus, storage and entity state writes.
+
+Home Assistant itself must be importable (the integration subclasses its
+entity classes), but no core instance, recorder or config entries are
+started, so thousands of zones can be driven from a single process.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime, timezone
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import CoreState
+
+from custom_components.zone_climate import climate, hub
+
+
+class FakeState:
+    """Minimal State: value, attributes and timestamps."""
+
+    __slots__ = ("entity_id", "state", "attributes", "last_updated", "last_reported")
+
+    def __init__(self, entity_id: str, state: str, attributes: dict | None = None):
+        self.entity_id = entity_id
+        self.state = state
+        self.attributes = attributes or {}
+        self.last_updated = self.last_reported = datetime.now(timezone.utc)
+
+
+class FakeEvent:
+    """Minimal Event carrying a data dict."""
+
+    __slots__ = ("event_type", "data")
+
+    def __init__(self, event_type: str, data: dict):
+        self.event_type = event_type
+        self.data = data
+
+
+class FakeBus:
+    """Event bus with an entity_id index for state change listeners."""
+
+    def __init__(self):
+        self.listeners: dict[str, list] = {}
+        self.entity_listeners: dict[str, list] = {}
+        self.fired = 0
+
+    def async_listen(self, event_type, listener, event_filter=None, **kwargs):
+        entry = (listener, event_filter)
+        self.listeners.setdefault(event_type, []).append(entry)
+        return lambda: self.listeners[event_type].remove(entry)
+
+    def async_listen_once(self, event_type, listener, **kwargs):
+        return self.async_listen(event_type, listener)
+
+    def async_fire(self, event_type: str, data: dict):
+        self.fired += 1
+        event = FakeEvent(event_type, data)
+        if event_type == EVENT_STATE_CHANGED:
+            for action in self.entity_listeners.get(data["entity_id"], ()):
+                action(event)
+        for listener, event_filter in self.listeners.get(event_type, ()):
+            if event_filter is None or event_filter(data):
+                listener(event)
+
+    def track_entities(self, entity_ids, action):
+        for entity_id in entity_ids:
+            self.entity_listeners.setdefault(entity_id, []).append(action)
+
+        def remove():
+            for entity_id in entity_ids:
+                self.entity_listeners[entity_id].remove(action)
+
+        return remove
+
+
+class FakeStates:
+    """State machine firing state_changed events on every change."""
+
+    def __init__(self, bus: FakeBus):
+        self._bus = bus
+        self._states: dict[str, FakeState] = {}
+
+    def get(self, entity_id: str) -> FakeState | None:
+        return self._states.get(entity_id)
+
+    def async_set(self, entity_id: str, state: str, attributes: dict | None = None):
+        old_state = self._states.get(entity_id)
+        new_state = FakeState(entity_id, state, attributes)
+        self._states[entity_id] = new_state
+        self._bus.async_fire(
+            EVENT_STATE_CHANGED,
+            {"entity_id": entity_id, "old_state": old_state, "new_state": new_state},
+        )
+
+
+class FakeServices:
+    """Service registry that records calls and applies them to the states."""
+
+    def __init__(self, states: FakeStates):
+        self._states = states
+        self.calls = 0
+        self.entities_commanded = 0
+
+    async def async_call(self, domain, service, data, blocking=False, **kwargs):
+        self.calls += 1
+        entity_ids = data["entity_id"]
+        if isinstance(entity_ids, str):
+            entity_ids = [entity_ids]
+        self.entities_commanded += len(entity_ids)
+        for entity_id in entity_ids:
+            # Devices acknowledge immediately
+            if service == "turn_on":
+                self._states.async_set(entity_id, "on")
+            elif service == "turn_off":
+                self._states.async_set(entity_id, "off")
+            elif service == "set_hvac_mode":
+                self._states.async_set(entity_id, data["hvac_mode"])
+            elif service == "set_temperature":
+                self._states.async_set(
+                    entity_id,
+                    data.get("hvac_mode", "heat"),
+                    {"temperature": data["temperature"]},
+                )
+
+
+class FakeConfig:
+    """Just enough of hass.config for the integration."""
+
+    def __init__(self):
+        self.config_dir = "."
+        self.time_zone = "UTC"
+
+
+class FakeHass:
+    """Stand-in for HomeAssistant wired to the fakes above."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.data = {}
+        self.bus = FakeBus()
+        self.states = FakeStates(self.bus)
+        self.services = FakeServices(self.states)
+        self.config = FakeConfig()
+        self.state = CoreState.running
+        self.is_stopping = False
+        self.is_running = True
+        self._tasks: set[asyncio.Task] = set()
+
+    def async_create_task(self, target, name=None, eager_start=False):
+        task = self.loop.create_task(target)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def async_run_hass_job(self, job, *args):
+        result = job.target(*args)
+        if asyncio.iscoroutine(result):
+            return self.async_create_task(result)
+        return result
+
+    def async_create_background_task(self, target, name=None, eager_start=False):
+        return self.async_create_task(target, name)
+
+    async def async_block_till_done(self):
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+
+def _track_state_change_event(hass, entity_ids, action):
+    if isinstance(entity_ids, str):
+        entity_ids = [entity_ids]
+    return hass.bus.track_entities(list(entity_ids), action)
+
+
+def _track_time_interval(hass, action, interval, **kwargs):
+    # Scheduler ticks are driven explicitly by the benchmark, if at all
+    return lambda: None
+
+
+class FakeStore:
+    """In-memory Store: nothing is restored and saves are only counted."""
+
+    def __init__(self, hass, version, key, **kwargs):
+        self.key = key
+        self.saves = 0
+
+    async def async_load(self):
+        return None
+
+    def async_delay_save(self, data_func, delay=0):
+        self.saves += 1
+
+
+async def _no_last_state(entity):
+    return None
+
+
+def install():
+    """Route the integration's event helpers and storage through the fakes."""
+    for module in (climate, hub):
+        module.async_track_state_change_event = _track_state_change_event
+        module.async_track_time_interval = _track_time_interval
+    hub.Store = FakeStore
+    climate.ZoneClimate.async_get_last_state = _no_last_state
+
+
+class WriteRecorder:
+    """Replaces async_write_ha_state, timing writes per zone."""
+
+    def __init__(self):
+        self.writes = 0
+        self.latencies: list[float] = []
+        self.pending: dict[str, list[float]] = {}
+
+    def attach(self, entity, zone_id: str, measure: bool):
+        def write():
+            self.writes += 1
+            if measure and (pending := self.pending.get(zone_id)):
+                now = time.perf_counter()
+                self.latencies.extend(now - sent for sent in pending)
+                pending.clear()
+
+        entity.async_write_ha_state = write
+
+    def event_sent(self, zone_id: str):
+        self.pending.setdefault(zone_id, []).append(time.perf_counter())
@@ -1,6 +1,14 @@
+import logging
+import time
+
 from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
 from .const import DOMAIN
+from .hub import ZoneClimateHub
+
+_LOGGER = logging.getLogger(__name__)
+
+PLATFORMS = ["binary_sensor", "climate", "sensor"]
 
 async def async_setup(hass: HomeAssistant, config):
     """Set up the integration (no YAML needed)."""
@@ -8,17 +16,37 @@ async def async_setup(hass: HomeAssistant, config):
 
 async def async_setup_entry(hass, entry):
     """Set up a config entry (UI) and forward to climate and sensors."""
+    started = time.perf_counter()
+    hub = ZoneClimateHub(hass, entry)
+    await hub.async_setup()
+
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = entry.data
+    hass.data[DOMAIN][entry.entry_id] = hub
+    hub_ready = time.perf_counter()
 
     # Forward setup to climate and sensors
-    await hass.config_entries.async_forward_entry_setups(entry, ["climate", "sensor"])
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
+
+    # Startup cost of the entry, to confirm it stays off the boot critical path
+    hub.setup_time = {
+        "hub_ms": round((hub_ready - started) * 1000, 1),
+        "platforms_ms": round((time.perf_counter() - hub_ready) * 1000, 1),
+    }
+    _LOGGER.debug("%s set up in %s", entry.title, hub.setup_time)
 
     return True
 
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry):
+    """Apply changed options, reloading only if the zones cannot take them."""
+    hub = hass.data[DOMAIN][entry.entry_id]
+    if not hub.async_reconfigure():
+        await hass.config_entries.async_reload(entry.entry_id)
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Unload a config entry."""
-    await hass.config_entries.async_forward_entry_unload(entry, "climate")
-    await hass.config_entries.async_forward_entry_unload(entry, "sensor")
-    hass.data[DOMAIN].pop(entry.entry_id)
-    return True
+    unloaded = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unloaded:
+        hub = hass.data[DOMAIN].pop(entry.entry_id)
+        hub.async_stop()
+    return unloaded
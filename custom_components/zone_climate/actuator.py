@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from homeassistant.components.climate import ATTR_HVAC_MODE, HVACMode
+from homeassistant.const import ATTR_ENTITY_ID, ATTR_TEMPERATURE, STATE_OFF, STATE_ON
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+
+from .metrics import TimingStats
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _state_matches(state, command: tuple) -> bool:
+    """Return True if the device already reports the commanded state."""
+    domain, service, items = command
+    data = dict(items)
+    if domain == "switch":
+        return state.state == (STATE_ON if service == "turn_on" else STATE_OFF)
+    if service == "set_hvac_mode":
+        return state.state == data[ATTR_HVAC_MODE]
+    if service == "set_temperature":
+        return (
+            state.state == data.get(ATTR_HVAC_MODE, HVACMode.HEAT)
+            and state.attributes.get(ATTR_TEMPERATURE) == data[ATTR_TEMPERATURE]
+        )
+    return False
+
+
+class ActuatorDispatcher:
+    """Batch and run the actuator service calls of every zone of a hub.
+
+    Calls queued in the same loop iteration with the same service and data,
+    apart from the entity, are merged into one multi-entity call. Calls run
+    concurrently up to a limit, each under a timeout. When a batch fails,
+    devices whose state shows the command applied are done; only the others
+    are retried on their own, so one dead device does not fail the rest.
+    """
+
+    def __init__(self, hass: HomeAssistant, max_concurrent: int, timeout: float):
+        """Initialize an empty queue."""
+        self.hass = hass
+        self._timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._queue: dict[tuple, list[tuple[str, asyncio.Future, float]]] = {}
+        self._flush_handle = None
+
+        self.latency = TimingStats()
+        self.calls = 0
+        self.commands = 0
+        self.retries = 0
+        self.failures = 0
+
+    def as_dict(self) -> dict:
+        """Return the dispatch counters and latency for diagnostics."""
+        return {
+            "calls": self.calls,
+            "commands": self.commands,
+            "retries": self.retries,
+            "failures": self.failures,
+            "latency": self.latency.as_dict(),
+        }
+
+    async def async_call(self, domain: str, service: str, data: dict):
+        """Queue a single-entity call and wait until it has been carried out."""
+        key = (
+            domain,
+            service,
+            tuple(sorted(item for item in data.items() if item[0] != ATTR_ENTITY_ID)),
+        )
+        future = self.hass.loop.create_future()
+        self._queue.setdefault(key, []).append(
+            (data[ATTR_ENTITY_ID], future, self.hass.loop.time())
+        )
+        if self._flush_handle is None:
+            self._flush_handle = self.hass.loop.call_soon(self._async_flush)
+        await future
+
+    @callback
+    def _async_flush(self):
+        """Start one call per batch of identical commands."""
+        self._flush_handle = None
+        queue, self._queue = self._queue, {}
+        for key, waiters in queue.items():
+            self.hass.async_create_task(self._async_run(key, waiters))
+
+    async def _async_run(self, key: tuple, waiters: list):
+        """Run one batch and hand the outcome to each waiting caller."""
+        domain, service, items = key
+        entity_ids = list(dict.fromkeys(entity_id for entity_id, _, _ in waiters))
+        data = dict(items)
+        data[ATTR_ENTITY_ID] = entity_ids if len(entity_ids) > 1 else entity_ids[0]
+        error = None
+        async with self._semaphore:
+            self.calls += 1
+            try:
+                async with asyncio.timeout(self._timeout):
+                    await self.hass.services.async_call(
+                        domain, service, data, blocking=True
+                    )
+            except TimeoutError:
+                error = HomeAssistantError(
+                    f"{domain}.{service} timed out after {self._timeout}s"
+                )
+            except HomeAssistantError as err:
+                error = err
+            except Exception as err:  # noqa: BLE001 - callers handle HA errors
+                error = HomeAssistantError(f"{domain}.{service} failed: {err!r}")
+
+        if error is not None and len(entity_ids) > 1:
+            # Devices that took the command are done, retry only the others
+            retry = {
+                entity_id
+                for entity_id in entity_ids
+                if (state := self.hass.states.get(entity_id)) is None
+                or not _state_matches(state, key)
+            }
+            self._async_resolve(
+                [waiter for waiter in waiters if waiter[0] not in retry], None
+            )
+            self.retries += len(retry)
+            await asyncio.gather(
+                *(
+                    self._async_run(
+                        key, [waiter for waiter in waiters if waiter[0] == entity_id]
+                    )
+                    for entity_id in retry
+                )
+            )
+            return
+        if error is not None:
+            self.failures += 1
+        self._async_resolve(waiters, error)
+
+    @callback
+    def _async_resolve(self, waiters: list, error: HomeAssistantError | None):
+        """Hand the outcome of a call to its waiting callers."""
+        now = self.hass.loop.time()
+        for _, future, queued_at in waiters:
+            self.commands += 1
+            self.latency.add(now - queued_at)
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(error)
+
+
+class ActuatorCommander:
+    """Send heating commands, dropping duplicates and rate limiting per device.
+
+    A command is dropped when the device already reports the commanded state,
+    or when it repeats the last command and the device has not reported
+    anything since. Commands arriving within the minimum interval of the
+    previous send are held back and only the latest one is sent once the
+    interval has passed.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        min_interval: float,
+        dispatcher: ActuatorDispatcher,
+    ):
+        """Initialize the commander."""
+        self.hass = hass
+        self._min_interval = min_interval
+        self._dispatcher = dispatcher
+        self._last_command: dict[str, tuple] = {}
+        self._last_sent: dict[str, float] = {}
+        self._state_at_send: dict[str, object] = {}
+        self._pending: dict[str, tuple] = {}
+        self._trailing: dict[str, object] = {}
+
+        self.sent = 0
+        self.suppressed = 0
+
+    @callback
+    def async_cancel(self):
+        """Drop any held back commands."""
+        for handle in self._trailing.values():
+            handle.cancel()
+        self._trailing.clear()
+        self._pending.clear()
+
+    async def async_send(self, domain: str, service: str, data: dict) -> bool:
+        """Send a service call to a single actuator unless it is redundant.
+
+        Returns False if the command was held back, so its outcome is not
+        known yet.
+        """
+        entity_id = data["entity_id"]
+        command = (domain, service, tuple(sorted(data.items())))
+
+        if self._is_redundant(entity_id, command):
+            self.suppressed += 1
+            # A newer redundant command supersedes anything still held back
+            if self._pending.pop(entity_id, None) is not None:
+                self._trailing.pop(entity_id).cancel()
+            return True
+
+        now = self.hass.loop.time()
+        last_sent = self._last_sent.get(entity_id)
+        send_at = now if last_sent is None else last_sent + self._min_interval
+        if send_at > now:
+            if entity_id in self._pending:
+                # The held back command is replaced before it was ever sent
+                self.suppressed += 1
+            else:
+                self._trailing[entity_id] = self.hass.loop.call_at(
+                    send_at, self._async_send_trailing, entity_id
+                )
+            self._pending[entity_id] = command
+            return False
+
+        if self._pending.pop(entity_id, None) is not None:
+            self._trailing.pop(entity_id).cancel()
+        await self._async_call(entity_id, command)
+        return True
+
+    @callback
+    def _async_send_trailing(self, entity_id: str):
+        """Send the latest held back command once the interval has passed."""
+        self._trailing.pop(entity_id, None)
+        command = self._pending.pop(entity_id, None)
+        if command is None:
+            return
+        if self._is_redundant(entity_id, command):
+            self.suppressed += 1
+            return
+        self.hass.async_create_task(self._async_call_trailing(entity_id, command))
+
+    async def _async_call_trailing(self, entity_id: str, command: tuple):
+        """Issue a held back command, which has no caller to report to."""
+        try:
+            await self._async_call(entity_id, command)
+        except HomeAssistantError as err:
+            _LOGGER.warning("%s: held back command failed: %s", entity_id, err)
+
+    async def _async_call(self, entity_id: str, command: tuple):
+        """Issue the service call and remember it."""
+        domain, service, items = command
+        self._last_command[entity_id] = command
+        self._last_sent[entity_id] = self.hass.loop.time()
+        state = self.hass.states.get(entity_id)
+        self._state_at_send[entity_id] = state.last_updated if state else None
+        self.sent += 1
+        try:
+            await self._dispatcher.async_call(domain, service, dict(items))
+        except HomeAssistantError:
+            # A failed command must not make its retry look redundant
+            self._last_command.pop(entity_id, None)
+            self._state_at_send.pop(entity_id, None)
+            raise
+
+    def _is_redundant(self, entity_id: str, command: tuple) -> bool:
+        """Return True if sending the command would not change anything."""
+        state = self.hass.states.get(entity_id)
+        if state is not None and _state_matches(state, command):
+            return True
+        if self._last_command.get(entity_id) != command:
+            return False
+        # Same command as last time, redundant until the device reports again
+        last_updated = state.last_updated if state else None
+        return last_updated == self._state_at_send.get(entity_id)
+
+
+class ActuatorHealth:
+    """Health and failover timing for one heating actuator."""
+
+    def __init__(self, entity_id: str):
+        """Initialize a healthy actuator."""
+        self.entity_id = entity_id
+        self.healthy = True
+        self.last_error: str | None = None
+        self.failures = 0
+        self.failovers = 0
+        self.recoveries = 0
+        self.last_recovery_time: float | None = None
+        self._total_recovery_time = 0.0
+        self._failed_at: float | None = None
+
+    def record_failure(self, now: float, error: str):
+        """Mark the actuator as failed."""
+        self.failures += 1
+        self.last_error = error
+        if self.healthy:
+            self.healthy = False
+            self._failed_at = now
+
+    def record_success(self, now: float):
+        """Mark the actuator as working, timing the recovery if it had failed."""
+        if self.healthy:
+            return
+        self.healthy = True
+        self.recoveries += 1
+        self.last_recovery_time = now - self._failed_at
+        self._total_recovery_time += self.last_recovery_time
+        self._failed_at = None
+
+    def as_dict(self) -> dict:
+        """Return the health state as state attributes."""
+        mean_recovery = None
+        if self.recoveries:
+            mean_recovery = round(self._total_recovery_time / self.recoveries, 1)
+        return {
+            "healthy": self.healthy,
+            "failures": self.failures,
+            "failovers": self.failovers,
+            "recoveries": self.recoveries,
+            "last_error": self.last_error,
+            "last_recovery_time": (
+                round(self.last_recovery_time, 1)
+                if self.last_recovery_time is not None
+                else None
+            ),
+            "mean_recovery_time": mean_recovery,
+        }
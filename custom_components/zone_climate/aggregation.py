@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+
+from .const import (
+    AGGREGATION_MAX,
+    AGGREGATION_MEAN,
+    AGGREGATION_MEDIAN,
+    AGGREGATION_MIN,
+    AGGREGATION_TRIMMED_MEAN,
+    AGGREGATION_WEIGHTED,
+    DEFAULT_TRIM_FRACTION,
+)
+
+# Strategies that read the TRV values in sorted order
+ORDERED_AGGREGATIONS = (
+    AGGREGATION_MEDIAN,
+    AGGREGATION_TRIMMED_MEAN,
+    AGGREGATION_MIN,
+    AGGREGATION_MAX,
+)
+
+
+class SensorGroup:
+    """Incremental aggregate over a room sensor and its TRV fallbacks.
+
+    Keeps a running sum and count of the valid TRV readings so a single
+    sensor change is applied as a delta instead of rescanning the group.
+    Order-based strategies additionally keep the readings in a sorted list,
+    updated by binary search, and the weighted strategy keeps a running
+    weighted sum.
+    """
+
+    def __init__(
+        self,
+        primary: str | None,
+        trvs: list[str],
+        aggregation: str = AGGREGATION_MEAN,
+        weights: dict[str, float] | None = None,
+        trim_fraction: float = DEFAULT_TRIM_FRACTION,
+    ):
+        """Initialize an empty group."""
+        self.primary = primary
+        self.trvs = frozenset(trvs)
+        self.aggregation = aggregation
+        self.primary_value: float | None = None
+        self._trv_values: dict[str, float] = {}
+        self._trv_sum = 0.0
+
+        self._ordered = aggregation in ORDERED_AGGREGATIONS
+        self._sorted: list[float] = []
+        self._trim_fraction = trim_fraction
+        self._weights = weights or {}
+        self._weighted_sum = 0.0
+        self._weight_total = 0.0
+
+    def __contains__(self, entity_id: str) -> bool:
+        return entity_id == self.primary or entity_id in self.trvs
+
+    @property
+    def trv_count(self) -> int:
+        """Number of TRVs currently holding a valid reading."""
+        return len(self._trv_values)
+
+    @property
+    def trv_value(self) -> float | None:
+        """The valid TRV readings combined with the group's strategy."""
+        count = len(self._trv_values)
+        if not count:
+            return None
+        if self.aggregation == AGGREGATION_WEIGHTED and self._weight_total > 0:
+            return self._weighted_sum / self._weight_total
+        if not self._ordered:
+            return self._trv_sum / count
+
+        ordered = self._sorted
+        if self.aggregation == AGGREGATION_MIN:
+            return ordered[0]
+        if self.aggregation == AGGREGATION_MAX:
+            return ordered[-1]
+        if self.aggregation == AGGREGATION_MEDIAN:
+            mid = count // 2
+            if count % 2:
+                return ordered[mid]
+            return (ordered[mid - 1] + ordered[mid]) / 2
+        # Trimmed mean, dropping the same share of readings from each end
+        trim = int(count * self._trim_fraction)
+        kept = ordered[trim : count - trim] if count > 2 * trim else ordered
+        return sum(kept) / len(kept)
+
+    def reset(self):
+        """Forget all readings."""
+        self.primary_value = None
+        self._trv_values.clear()
+        self._trv_sum = 0.0
+        self._sorted.clear()
+        self._weighted_sum = 0.0
+        self._weight_total = 0.0
+
+    def update(self, entity_id: str, value: float | None) -> bool:
+        """Apply a new reading for one member, return True if it changed."""
+        if entity_id == self.primary:
+            if value == self.primary_value:
+                return False
+            self.primary_value = value
+            return True
+
+        old = self._trv_values.get(entity_id)
+        if value == old:
+            return False
+        weight = self._weights.get(entity_id, 1.0)
+        if old is not None:
+            del self._trv_values[entity_id]
+            self._trv_sum -= old
+            self._weighted_sum -= old * weight
+            self._weight_total -= weight
+            if self._ordered:
+                del self._sorted[bisect_left(self._sorted, old)]
+        if value is not None:
+            self._trv_values[entity_id] = value
+            self._trv_sum += value
+            self._weighted_sum += value * weight
+            self._weight_total += weight
+            if self._ordered:
+                insort(self._sorted, value)
+        if not self._trv_values:
+            # Drop accumulated rounding error whenever the group empties
+            self._trv_sum = 0.0
+            self._weighted_sum = 0.0
+            self._weight_total = 0.0
+        return True
+
+    def result(self) -> tuple[float | None, str | None, float | None]:
+        """Return the zone value, its source label and room/TRV variation."""
+        trv_value = self.trv_value
+        variation = None
+        if self.primary_value is not None and trv_value is not None:
+            variation = round(self.primary_value - trv_value, 1)
+
+        if self.primary_value is not None:
+            return self.primary_value, "Room", variation
+        if trv_value is not None:
+            return trv_value, "TRV", variation
+        return None, None, variation
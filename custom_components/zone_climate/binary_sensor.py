@@ -0,0 +1,61 @@
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+)
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .coordinator import ZoneClimateCoordinator
+
+
+async def async_setup_entry(hass, entry, async_add_entities):
+    """Set up Zone Climate binary sensors from config entry."""
+    hub = hass.data[DOMAIN][entry.entry_id]
+    async_add_entities(
+        ZoneOpenWindowSensor(coordinator, f"{coordinator.config['zone_name']} Open Window")
+        for coordinator in hub.coordinators.values()
+        if coordinator.temp_group.primary or coordinator.temp_group.trvs
+    )
+
+
+class ZoneOpenWindowSensor(CoordinatorEntity[ZoneClimateCoordinator], BinarySensorEntity):
+    """On while the zone's temperature suggests a window is open."""
+
+    _attr_device_class = BinarySensorDeviceClass.WINDOW
+    _attr_should_poll = False
+
+    def __init__(self, coordinator, name):
+        super().__init__(coordinator)
+        self._attr_name = name
+        self._attr_unique_id = f"{coordinator.zone_id}_open_window"
+        self._last_written = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when a window opens, closes or is detected again."""
+        written = (self.is_on, self.coordinator.window_detections)
+        if written == self._last_written:
+            return
+        self._last_written = written
+        self.async_write_ha_state()
+
+    @property
+    def is_on(self) -> bool:
+        """Return True while an open window is detected."""
+        data = self.coordinator.data
+        return bool(data and data.open_window)
+
+    @property
+    def extra_state_attributes(self):
+        """Return the detection counters."""
+        last = self.coordinator.window_last_detected
+        return {
+            "detections": self.coordinator.window_detections,
+            "last_detected": last.isoformat() if last else None,
+            "heating_pause": round(self.coordinator.open_window_pause / 60),
+        }
+
+    @property
+    def device_info(self):
+        return {"identifiers": {(DOMAIN, self.coordinator.zone_id)}}
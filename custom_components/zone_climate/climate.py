@@ -1,200 +1,566 @@
 from __future__ import annotations
 
 import logging
+import time
+from datetime import timedelta
+
 from homeassistant.components.climate import (
     ClimateEntity,
     ClimateEntityFeature,
+    HVACAction,
     HVACMode,
 )
-from homeassistant.const import ATTR_TEMPERATURE
-from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.const import ATTR_TEMPERATURE, STATE_UNAVAILABLE
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import (
+    async_track_state_change_event,
+    async_track_time_interval,
+)
+from homeassistant.helpers.restore_state import RestoreEntity
+from homeassistant.helpers.start import async_at_started
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
-
-from .const import DOMAIN
-from .const import TEMP_CELSIUS
+from homeassistant.util import dt as dt_util
+from homeassistant.util.unit_conversion import TemperatureConverter
+
+from .actuator import ActuatorCommander, ActuatorDispatcher, ActuatorHealth
+from .const import (
+    BACKUP_REASON_FAILOVER,
+    BACKUP_REASON_STAGED,
+    BACKUP_STAGE_MARGIN,
+    CONF_ACTUATOR_MIN_INTERVAL,
+    CONF_BACKUP_STAGE_DELAY,
+    CONF_CONTROL_MODE,
+    CONF_CYCLE_PERIOD,
+    CONF_HYSTERESIS,
+    CONF_KD,
+    CONF_KI,
+    CONF_KP,
+    CONF_MAX_PREHEAT,
+    CONF_MIN_OFF_TIME,
+    CONF_MIN_ON_TIME,
+    CONF_SCHEDULE,
+    CONF_ZONE_ID,
+    CONTROL_INTERVAL,
+    CONTROL_MODE_HYSTERESIS,
+    CONTROL_MODE_PID,
+    DEFAULT_ACTUATOR_MIN_INTERVAL,
+    DEFAULT_BACKUP_STAGE_DELAY,
+    DEFAULT_CONTROL_MODE,
+    DEFAULT_CYCLE_PERIOD,
+    DEFAULT_HYSTERESIS,
+    DEFAULT_KD,
+    DEFAULT_KI,
+    DEFAULT_KP,
+    DEFAULT_MAX_PREHEAT,
+    DEFAULT_MIN_OFF_TIME,
+    DEFAULT_MIN_ON_TIME,
+    DOMAIN,
+    HEAT_RATE_MIN_SAMPLES,
+    HEAT_RATE_MIN_SPAN,
+    HEAT_RATE_SAMPLES,
+    TEMP_CELSIUS,
+)
+from .controller import Controller, HysteresisController, PIDController
+from .coordinator import ZoneClimateCoordinator, ZoneData
+from .preheat import HeatRateEstimator, PreheatScheduler
 
 _LOGGER = logging.getLogger(__name__)
 
 async def async_setup_entry(hass: HomeAssistant, entry, async_add_entities):
     """Set up ZoneClimate entity from a config entry."""
-    async_add_entities([ZoneClimate(hass, entry)], True)
+    hub = hass.data[DOMAIN][entry.entry_id]
+    async_add_entities(
+        ZoneClimate(coordinator, hub.dispatcher, hub.boiler_entity)
+        for coordinator in hub.coordinators.values()
+    )
+
+
+def _build_controller(config) -> Controller | None:
+    """Create the closed-loop controller selected for the zone, if any."""
+    mode = config.get(CONF_CONTROL_MODE, DEFAULT_CONTROL_MODE)
+    min_on = config.get(CONF_MIN_ON_TIME, DEFAULT_MIN_ON_TIME)
+    min_off = config.get(CONF_MIN_OFF_TIME, DEFAULT_MIN_OFF_TIME)
+    if mode == CONTROL_MODE_HYSTERESIS:
+        return HysteresisController(
+            config.get(CONF_HYSTERESIS, DEFAULT_HYSTERESIS), min_on, min_off
+        )
+    if mode == CONTROL_MODE_PID:
+        return PIDController(
+            config.get(CONF_KP, DEFAULT_KP),
+            config.get(CONF_KI, DEFAULT_KI),
+            config.get(CONF_KD, DEFAULT_KD),
+            config.get(CONF_CYCLE_PERIOD, DEFAULT_CYCLE_PERIOD),
+            min_on,
+            min_off,
+        )
+    return None
 
 
-class ZoneClimate(ClimateEntity):
+class ZoneClimate(
+    CoordinatorEntity[ZoneClimateCoordinator], ClimateEntity, RestoreEntity
+):
     """Representation of a Zone Climate thermostat."""
 
     _attr_hvac_modes = [HVACMode.HEAT, HVACMode.OFF]
     _attr_supported_features = ClimateEntityFeature.TARGET_TEMPERATURE
     _attr_temperature_unit = TEMP_CELSIUS
     _attr_target_temperature_step = 0.5
+    # Counters and ages change on nearly every write, recording them would
+    # store a new attributes row each time
+    _unrecorded_attributes = frozenset(
+        {
+            "recomputations_avoided",
+            "commands_sent",
+            "commands_suppressed",
+            "controller_output",
+            "zone_temp_age",
+            "zone_humidity_age",
+        }
+    )
 
     @property
     def device_info(self):
         return {
-            "identifiers": {(DOMAIN, self.entry.entry_id)},  # Use entry.entry_id for uniqueness
+            "identifiers": {(DOMAIN, self.coordinator.zone_id)},  # Entry id, or zone id within a hub
             "name": self._attr_name,
             "manufacturer": "Zenntrix Software Ltd",
             "model": "Zone Climate",
         }
 
-    def __init__(self, hass: HomeAssistant, entry):
+    def __init__(
+        self,
+        coordinator: ZoneClimateCoordinator,
+        dispatcher: ActuatorDispatcher,
+        boiler: str | None = None,
+    ):
         """Initialize the zone climate entity."""
-        self.hass = hass
-        self.entry = entry
-        self._attr_name = entry.data["zone_name"]
+        super().__init__(coordinator)
+        config = self._config = coordinator.config
+        self._attr_name = config["zone_name"]
 
         # Config
-        self._zone_temp_sensor = entry.data.get("zone_temp_sensor")
-        self._zone_humidity_sensor = entry.data.get("zone_humidity_sensor")
-        self._trv_temp_sensors = entry.data.get("trv_temp_sensors", [])
-        self._trv_humidity_sensors = entry.data.get("trv_humidity_sensors", [])
-        self._primary_heating = entry.data.get("primary_heating_control")
-        self._backup_heating = entry.data.get("backup_heating_control")
+        self._primary_heating = config.get("primary_heating_control")
+        self._backup_heating = config.get("backup_heating_control")
+        # The hub's boiler is fired from the demand of all zones, a zone
+        # does not switch it itself
+        self._boiler = boiler
+        self._commander = ActuatorCommander(
+            coordinator.hass,
+            config.get(CONF_ACTUATOR_MIN_INTERVAL, DEFAULT_ACTUATOR_MIN_INTERVAL),
+            dispatcher,
+        )
+        self._control_mode = config.get(CONF_CONTROL_MODE, DEFAULT_CONTROL_MODE)
+        self._controller = _build_controller(config)
+        self._actuator_on: bool | None = None
+
+        # Backup heating, staged in on a persistent error or on primary failure
+        self._stage_delay = (
+            config.get(CONF_BACKUP_STAGE_DELAY, DEFAULT_BACKUP_STAGE_DELAY) * 60
+        )
+        self._health = {
+            entity_id: ActuatorHealth(entity_id)
+            for entity_id in (self._primary_heating, self._backup_heating)
+            if entity_id
+        }
+        self._primary_on = False
+        self._backup_reason: str | None = None
+        self._demand_since: float | None = None
+        self._control_started = False
+        self._unsub_primary = None
+
+        # Heating is paused while the coordinator reports an open window
+        self._pause_on_window = coordinator.open_window_pause > 0
+        self._window_paused = False
+
+        # Optimum start of scheduled setpoints from the learned heat-up rate
+        self._heat_rate = HeatRateEstimator(
+            HEAT_RATE_SAMPLES, HEAT_RATE_MIN_SAMPLES, HEAT_RATE_MIN_SPAN
+        )
+        self._scheduler = None
+        if config.get(CONF_SCHEDULE):
+            self._scheduler = PreheatScheduler(
+                config[CONF_SCHEDULE],
+                config.get(CONF_MAX_PREHEAT, DEFAULT_MAX_PREHEAT),
+            )
+        self._schedule_after = None
+        self._preheat_start = None
 
         # State
-        self._attr_unique_id = f"{DOMAIN}_{self._attr_name.lower().replace(' ', '_')}"
+        if CONF_ZONE_ID in config:
+            # Zone names need not be unique within a hub
+            self._attr_unique_id = f"{DOMAIN}_{coordinator.zone_id}"
+        else:
+            self._attr_unique_id = f"{DOMAIN}_{self._attr_name.lower().replace(' ', '_')}"
         self._attr_current_temperature = None
         self._attr_target_temperature = 20.0
         self._attr_hvac_mode = HVACMode.OFF
-        self._source_temp = None
-        self._source_humidity = None
-
-        # Listen to sensors
-        all_sensors = []
-        if self._zone_temp_sensor:
-            all_sensors.append(self._zone_temp_sensor)
-        if self._zone_humidity_sensor:
-            all_sensors.append(self._zone_humidity_sensor)
-        all_sensors.extend(self._trv_temp_sensors)
-        all_sensors.extend(self._trv_humidity_sensors)
-
-        async_track_state_change_event(
-            hass,
-            all_sensors,
-            self._async_sensor_changed,
-        )
+        self._update_from_coordinator()
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the zone and start control once Home Assistant has started."""
+        await super().async_added_to_hass()
+        await self._async_restore()
+        self.async_on_remove(async_at_started(self.hass, self._async_start_control))
+
+    async def _async_start_control(self, _hass=None):
+        """Start the control tick and watch the heating controls."""
+        # Deferred so the control loop is not on the startup critical path
+        # and does not act on readings still arriving during startup
+        self._control_started = True
+        self._schedule_after = dt_util.now()
+        if self._controller or self._backup_heating or self._scheduler:
+            self.async_on_remove(
+                async_track_time_interval(
+                    self.hass,
+                    self._async_tick,
+                    timedelta(seconds=CONTROL_INTERVAL),
+                )
+            )
+        if self._backup_heating:
+            self._async_track_primary()
+        if not self._controller and self._attr_hvac_mode == HVACMode.HEAT:
+            # Resume a restored heat mode, so the zone calls for heat again
+            await self._turn_on_heating()
+        self._async_update_demand()
+        if self._controller or self._backup_heating:
+            await self._async_evaluate()
+
+    async def _async_restore(self):
+        """Resume the setpoint, mode and controller state after a restart."""
+        saved = self.coordinator.climate_state
+        if not saved and (last_state := await self.async_get_last_state()):
+            # No snapshot yet, fall back to the last recorded state
+            saved = {
+                "hvac_mode": last_state.state,
+                "target_temperature": last_state.attributes.get(ATTR_TEMPERATURE),
+            }
+        if saved.get("hvac_mode") in self._attr_hvac_modes:
+            self._attr_hvac_mode = HVACMode(saved["hvac_mode"])
+        if saved.get("target_temperature") is not None:
+            self._attr_target_temperature = saved["target_temperature"]
+        if saved.get("heat_rate"):
+            self._heat_rate.rate = saved["heat_rate"]
+        if self._controller and saved.get("controller"):
+            # The actuator is left unknown so the first decision is sent,
+            # the commander drops it if the device already agrees
+            self._controller.restore(saved["controller"])
+
+    @callback
+    def _async_save_state(self):
+        """Keep the setpoint, mode and controller state in the zone snapshot."""
+        state = {
+            "hvac_mode": self._attr_hvac_mode,
+            "target_temperature": self._attr_target_temperature,
+        }
+        if self._controller:
+            state["controller"] = self._controller.as_dict()
+        if self._heat_rate.rate is not None:
+            state["heat_rate"] = self._heat_rate.rate
+        if state == self.coordinator.climate_state:
+            return
+        self.coordinator.climate_state = state
+        self.coordinator.schedule_save()
+
+    @property
+    def _staging_enabled(self) -> bool:
+        return bool(self._backup_heating and self._stage_delay)
 
-    async def async_added_to_hass(self):
-        """Run when entity is added to HA."""
-        # Populate initial values
-        await self.async_update()
+    async def async_will_remove_from_hass(self) -> None:
+        """Drop held back actuator commands."""
+        await super().async_will_remove_from_hass()
+        self._commander.async_cancel()
+        if self._unsub_primary:
+            self._unsub_primary()
+            self._unsub_primary = None
 
     @callback
-    async def _async_sensor_changed(self, event):
-        """Handle sensor state changes."""
-        await self.async_update_ha_state(force_refresh=True)
-
-    async def async_update(self):
-        """Fetch new state data for the entity."""
-        temp = None
-        humidity = None
-
-        # Temperature: prefer room
-        if self._zone_temp_sensor:
-            state = self.hass.states.get(self._zone_temp_sensor)
-            if state and state.state not in (None, "unknown", "unavailable"):
-                temp = float(state.state)
-                self._source_temp = "Room"
-
-        # Fallback to TRVs
-        if temp is None and self._trv_temp_sensors:
-            vals = []
-            for s in self._trv_temp_sensors:
-                st = self.hass.states.get(s)
-                if st and st.state not in (None, "unknown", "unavailable"):
-                    try:
-                        vals.append(float(st.state))
-                    except ValueError:
-                        pass
-            if vals:
-                temp = sum(vals) / len(vals)
-                self._source_temp = "TRV"
-
-        # Humidity: prefer room
-        if self._zone_humidity_sensor:
-            state = self.hass.states.get(self._zone_humidity_sensor)
-            if state and state.state not in (None, "unknown", "unavailable"):
-                humidity = float(state.state)
-                self._source_humidity = "Room"
-
-        # Fallback to TRVs
-        if humidity is None and self._trv_humidity_sensors:
-            vals = []
-            for s in self._trv_humidity_sensors:
-                st = self.hass.states.get(s)
-                if st and st.state not in (None, "unknown", "unavailable"):
-                    try:
-                        vals.append(float(st.state))
-                    except ValueError:
-                        pass
-            if vals:
-                humidity = sum(vals) / len(vals)
-                self._source_humidity = "TRV"
-
-        self._attr_current_temperature = temp
-        self._attr_extra_state_attributes = {
-            "zone_temp_source": self._source_temp,
-            "zone_humidity_source": self._source_humidity,
-            "zone_temp_variation": self._calc_temp_variation(),
-            "zone_humidity_variation": self._calc_humidity_variation(),
+    def _async_track_primary(self):
+        """Watch the primary heating control for failover."""
+        if self._unsub_primary:
+            self._unsub_primary()
+        self._unsub_primary = async_track_state_change_event(
+            self.hass, [self._primary_heating], self._async_primary_changed
+        )
+
+    @property
+    def extra_state_attributes(self):
+        """Return zone readings, controller state and command counters."""
+        attrs = {
+            **self._attr_extra_state_attributes,
+            "control_mode": self._control_mode,
+            "commands_sent": self._commander.sent,
+            "commands_suppressed": self._commander.suppressed,
         }
+        if self._controller:
+            attrs["heating_cycles"] = self._controller.cycles
+        if isinstance(self._controller, PIDController):
+            attrs["controller_output"] = round(self._controller.output, 2)
+        if self._backup_heating:
+            attrs["backup_active"] = self._backup_reason is not None
+            attrs["backup_reason"] = self._backup_reason
+            attrs["primary_health"] = self._health[self._primary_heating].as_dict()
+            attrs["backup_health"] = self._health[self._backup_heating].as_dict()
+        if self._pause_on_window:
+            attrs["window_paused"] = self._window_paused
+        if self._scheduler:
+            rate = self._heat_rate.rate
+            attrs["heat_rate"] = round(rate, 4) if rate is not None else None
+            attrs["preheat_start"] = (
+                self._preheat_start.isoformat() if self._preheat_start else None
+            )
+        return attrs
 
-    def _calc_temp_variation(self):
-        """Difference between room and TRV temps."""
-        if not self._zone_temp_sensor or not self._trv_temp_sensors:
-            return None
-        primary_state = self.hass.states.get(self._zone_temp_sensor)
-        if not primary_state:
-            return None
-        try:
-            primary_val = float(primary_state.state)
-        except (ValueError, TypeError):
-            return None
-        trv_vals = []
-        for s in self._trv_temp_sensors:
-            st = self.hass.states.get(s)
-            if st:
-                try:
-                    trv_vals.append(float(st.state))
-                except (ValueError, TypeError):
-                    pass
-        if not trv_vals:
+    @property
+    def hvac_action(self) -> HVACAction | None:
+        """Return the current action when the zone runs its own control loop."""
+        if not self._controller:
             return None
-        return round(primary_val - (sum(trv_vals) / len(trv_vals)), 1)
+        if self._attr_hvac_mode == HVACMode.OFF:
+            return HVACAction.OFF
+        return HVACAction.HEATING if self._actuator_on else HVACAction.IDLE
 
-    def _calc_humidity_variation(self):
-        """Difference between room and TRV humidity."""
-        if not self._zone_humidity_sensor or not self._trv_humidity_sensors:
-            return None
-        primary_state = self.hass.states.get(self._zone_humidity_sensor)
-        if not primary_state:
-            return None
-        try:
-            primary_val = float(primary_state.state)
-        except (ValueError, TypeError):
-            return None
-        trv_vals = []
-        for s in self._trv_humidity_sensors:
-            st = self.hass.states.get(s)
-            if st:
-                try:
-                    trv_vals.append(float(st.state))
-                except (ValueError, TypeError):
-                    pass
-        if not trv_vals:
-            return None
-        return round(primary_val - (sum(trv_vals) / len(trv_vals)), 1)
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Take the zone readings pushed by the coordinator."""
+        if self.coordinator.config is not self._config:
+            self._async_reconfigure()
+        self._update_from_coordinator()
+        if self._control_started:
+            self._async_update_demand()
+        if self._control_started and (
+            self._controller or self._backup_heating or self._window_changed
+        ):
+            self.hass.async_create_task(self._async_evaluate())
+        self.async_write_ha_state()
+
+    @property
+    def _heating(self) -> bool:
+        """Return True while the primary is heating the zone."""
+        if not self._primary_on:
+            return False
+        if self._controller:
+            return True
+        # In setpoint mode the primary holds the target, it only heats
+        # while the zone is below it
+        current = self._attr_current_temperature
+        return current is not None and current < self._attr_target_temperature
+
+    @callback
+    def _async_update_demand(self):
+        """Tell the coordinator whether the zone is calling for heat."""
+        self.coordinator.heating = self._heating or self._backup_reason is not None
+
+    @callback
+    def _async_reconfigure(self):
+        """Move to the heating controls of the zone's new options."""
+        config = self._config = self.coordinator.config
+        old = (self._primary_heating, self._backup_heating)
+        self._primary_heating = config.get("primary_heating_control")
+        self._backup_heating = config.get("backup_heating_control")
+        if (self._primary_heating, self._backup_heating) == old:
+            return
+        # Health is kept for the controls still in use
+        self._health = {
+            entity_id: self._health.get(entity_id) or ActuatorHealth(entity_id)
+            for entity_id in (self._primary_heating, self._backup_heating)
+            if entity_id
+        }
+        if self._unsub_primary:
+            self._async_track_primary()
+        self.hass.async_create_task(self._async_switch_controls(old))
+
+    async def _async_switch_controls(self, old: tuple[str | None, str | None]):
+        """Turn off replaced heating controls and carry on with the new ones."""
+        for entity_id in old:
+            if not entity_id or entity_id in self._health or entity_id == self._boiler:
+                continue
+            service, service_data = self._service_call(entity_id, False)
+            try:
+                await self._commander.async_send(
+                    service.split(".")[0], service.split(".")[1], service_data
+                )
+            except HomeAssistantError as err:
+                _LOGGER.warning("%s: %s failed: %s", self._attr_name, service, err)
+        if self._primary_on:
+            await self._turn_on_heating()
+        if self._backup_reason is not None:
+            await self._async_set_backup(self._backup_reason)
+
+    async def _async_tick(self, now=None):
+        """Re-evaluate control and staging, and retry a failed primary."""
+        if self._scheduler:
+            await self._async_run_schedule()
+        if self._backup_reason == BACKUP_REASON_FAILOVER and self._primary_on:
+            if await self._async_command(self._primary_heating, True):
+                await self._async_recover()
+        await self._async_evaluate()
+
+    async def _async_run_schedule(self):
+        """Learn the heat-up rate and apply scheduled setpoints, early if needed."""
+        current = self._attr_current_temperature
+        # Holding the target in setpoint mode is not heating up, so only
+        # learn while the zone is actually below it or the actuator is on
+        if self._heating and current is not None:
+            rate = self._heat_rate.rate
+            self._heat_rate.add(self.hass.loop.time() / 60, current)
+            if self._heat_rate.rate != rate:
+                self._async_save_state()
+        else:
+            self._heat_rate.end_run()
+
+        upcoming = self._scheduler.next_setpoint(self._schedule_after)
+        if upcoming is None:
+            self._preheat_start = None
+            return
+        when, temperature = upcoming
+        self._preheat_start = when - self._scheduler.lead_time(
+            current, temperature, self._heat_rate.rate
+        )
+        if dt_util.now() < self._preheat_start:
+            return
+        _LOGGER.debug(
+            "%s: setting %.1f° scheduled for %s", self._attr_name, temperature, when
+        )
+        self._schedule_after = when
+        await self.async_set_temperature(temperature=temperature)
+
+    @property
+    def _window_changed(self) -> bool:
+        """Return True if an open window should start or end a pause."""
+        data = self.coordinator.data
+        open_window = bool(data and data.open_window and self._pause_on_window)
+        return open_window != self._window_paused
+
+    async def _async_evaluate(self):
+        """Run the control loop and backup staging on the latest readings."""
+        if self._window_changed:
+            await self._async_pause_for_window(not self._window_paused)
+        if self._controller:
+            await self._async_control()
+        if self._staging_enabled:
+            await self._async_stage_backup()
+
+    async def _async_pause_for_window(self, paused: bool):
+        """Pause heating while a window is open, resume once it is closed."""
+        _LOGGER.info(
+            "%s: %s heating for an open window",
+            self._attr_name,
+            "pausing" if paused else "resuming",
+        )
+        self._window_paused = paused
+        if not self._controller and self._attr_hvac_mode == HVACMode.HEAT:
+            if paused:
+                await self._turn_off_heating()
+            else:
+                await self._turn_on_heating()
+        self.async_write_ha_state()
+
+    async def _async_stage_backup(self):
+        """Bring in the backup when the primary cannot close the error."""
+        current = self._attr_current_temperature
+        if (
+            self._attr_hvac_mode != HVACMode.HEAT
+            or current is None
+            or self._window_paused
+        ):
+            error = None
+        else:
+            error = self._attr_target_temperature - current
+
+        if error is None or error <= 0:
+            self._demand_since = None
+            if self._backup_reason == BACKUP_REASON_STAGED:
+                await self._async_set_backup(None)
+            return
+        if error <= BACKUP_STAGE_MARGIN or self._backup_reason is not None:
+            return
+
+        now = self.hass.loop.time()
+        if self._demand_since is None:
+            self._demand_since = now
+        elif now - self._demand_since >= self._stage_delay:
+            _LOGGER.info(
+                "%s: primary heating has not closed a %.1f° error, staging in %s",
+                self._attr_name,
+                error,
+                self._backup_heating,
+            )
+            await self._async_set_backup(BACKUP_REASON_STAGED)
+
+    @callback
+    def _async_primary_changed(self, event: Event):
+        """Fail over or recover when the primary becomes (un)available."""
+        new_state = event.data.get("new_state")
+        if new_state is None:
+            return
+        health = self._health[self._primary_heating]
+        now = self.hass.loop.time()
+        if new_state.state == STATE_UNAVAILABLE:
+            health.record_failure(now, STATE_UNAVAILABLE)
+            if self._primary_on:
+                self.hass.async_create_task(self._async_failover())
+        elif not health.healthy:
+            health.record_success(now)
+            self.hass.async_create_task(self._async_recover())
+
+    async def _async_control(self):
+        """Drive the primary actuator from the controller decision."""
+        if self._attr_hvac_mode != HVACMode.HEAT:
+            return
+        if self._window_paused:
+            # Start cycles afresh once the window is closed
+            self._controller.reset()
+            heating = False
+        else:
+            heating = self._controller.update(
+                self._attr_current_temperature,
+                self._attr_target_temperature,
+                self.hass.loop.time(),
+            )
+        self._async_save_state()
+        if heating == self._actuator_on:
+            return
+        self._actuator_on = heating
+        if heating:
+            await self._turn_on_heating()
+        else:
+            await self._turn_off_heating()
+        self.async_write_ha_state()
+
+    def _update_from_coordinator(self):
+        """Copy the shared zone readings onto the entity."""
+        data = self.coordinator.data or ZoneData()
+        self._attr_current_temperature = data.temperature
+        self._attr_current_humidity = data.humidity
+        self._attr_extra_state_attributes = {
+            "zone_temp_source": data.temp_source,
+            "zone_temp_aggregation": self.coordinator.temp_group.aggregation,
+            "zone_temp_age": data.temp_age,
+            "zone_humidity_age": data.humidity_age,
+            "zone_humidity_source": data.humidity_source,
+            "zone_temp_variation": data.temp_variation,
+            "zone_humidity_variation": data.humidity_variation,
+            "recomputations_avoided": self.coordinator.recomputations_avoided,
+        }
 
     async def async_set_hvac_mode(self, hvac_mode: HVACMode):
         """Set HVAC mode."""
         self._attr_hvac_mode = hvac_mode
         if hvac_mode == HVACMode.OFF:
+            if self._controller:
+                self._controller.reset()
+                self._actuator_on = False
+            self._demand_since = None
             await self._turn_off_heating()
         elif hvac_mode == HVACMode.HEAT:
-            await self._turn_on_heating()
+            if self._controller:
+                await self._async_control()
+            elif not self._window_paused:
+                await self._turn_on_heating()
 
+        self._async_save_state()
         self.async_write_ha_state()
 
     async def async_set_temperature(self, **kwargs):
@@ -202,41 +568,124 @@ class ZoneClimate(ClimateEntity):
         if ATTR_TEMPERATURE in kwargs:
             self._attr_target_temperature = kwargs[ATTR_TEMPERATURE]
 
-            if self._attr_hvac_mode == HVACMode.HEAT:
+            if self._controller:
+                await self._async_control()
+            elif self._attr_hvac_mode == HVACMode.HEAT and not self._window_paused:
                 await self._turn_on_heating()
 
+            self._async_save_state()
             self.async_write_ha_state()
 
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state, counting writes for diagnostics."""
+        self.coordinator.metrics.state_writes += 1
+        super().async_write_ha_state()
+
     async def _turn_on_heating(self):
         """Turn on heating via room or TRV control."""
-        service_data = {}
-        if self._primary_heating.startswith("climate."):
-            service = "climate.set_temperature"
-            service_data = {
-                "entity_id": self._primary_heating,
-                "temperature": self._attr_target_temperature,
-                "hvac_mode": HVACMode.HEAT,
-            }
-        else:
-            service = "switch.turn_on"
-            service_data = {"entity_id": self._primary_heating}
-
-        await self.hass.services.async_call(
-            service.split(".")[0], service.split(".")[1], service_data
+        started = time.perf_counter()
+        self._primary_on = True
+        self._async_update_demand()
+        if not await self._async_command(self._primary_heating, True):
+            await self._async_failover()
+        # Mostly spent awaiting the device, not holding up the event loop
+        self.coordinator.metrics.record(
+            "turn_on_heating", time.perf_counter() - started, check_slow=False
         )
 
     async def _turn_off_heating(self):
         """Turn off heating via room or TRV control."""
-        if self._primary_heating.startswith("climate."):
-            service = "climate.set_hvac_mode"
-            service_data = {
-                "entity_id": self._primary_heating,
-                "hvac_mode": HVACMode.OFF,
-            }
-        else:
-            service = "switch.turn_off"
-            service_data = {"entity_id": self._primary_heating}
+        started = time.perf_counter()
+        self._primary_on = False
+        self._async_update_demand()
+        await self._async_command(self._primary_heating, False)
+        if self._backup_reason is not None:
+            await self._async_set_backup(None)
+        # Mostly spent awaiting the device, not holding up the event loop
+        self.coordinator.metrics.record(
+            "turn_off_heating", time.perf_counter() - started, check_slow=False
+        )
+
+    async def _async_failover(self):
+        """Heat through the backup while the primary is failing."""
+        if not self._backup_heating or self._backup_reason == BACKUP_REASON_FAILOVER:
+            return
+        _LOGGER.warning(
+            "%s: primary heating %s failed, failing over to %s",
+            self._attr_name,
+            self._primary_heating,
+            self._backup_heating,
+        )
+        self._health[self._primary_heating].failovers += 1
+        await self._async_set_backup(BACKUP_REASON_FAILOVER)
 
-        await self.hass.services.async_call(
-            service.split(".")[0], service.split(".")[1], service_data
-	)
+    async def _async_recover(self):
+        """Hand heating back to the primary once it has recovered."""
+        if self._primary_on:
+            await self._turn_on_heating()
+        if self._backup_reason == BACKUP_REASON_FAILOVER:
+            await self._async_set_backup(None)
+            # Staging decides afresh whether the backup is still needed
+            self._demand_since = None
+
+    async def _async_set_backup(self, reason: str | None):
+        """Switch the backup on for the given reason, or off for None."""
+        self._backup_reason = reason
+        self._async_update_demand()
+        await self._async_command(self._backup_heating, reason is not None)
+        self.async_write_ha_state()
+
+    def _service_call(self, entity_id: str, on: bool) -> tuple[str, dict]:
+        """Return the service and data that switch a heating control."""
+        if entity_id.startswith("climate."):
+            if on:
+                # Service calls take temperatures in the system unit, which
+                # is also what the TRV reports back; rounded so the commander
+                # can compare the two
+                target = TemperatureConverter.convert(
+                    self._attr_target_temperature,
+                    TEMP_CELSIUS,
+                    self.hass.config.units.temperature_unit,
+                )
+                service = "climate.set_temperature"
+                service_data = {
+                    "entity_id": entity_id,
+                    "temperature": round(target, 2),
+                    "hvac_mode": HVACMode.HEAT,
+                }
+            else:
+                service = "climate.set_hvac_mode"
+                service_data = {
+                    "entity_id": entity_id,
+                    "hvac_mode": HVACMode.OFF,
+                }
+        else:
+            service = "switch.turn_on" if on else "switch.turn_off"
+            service_data = {"entity_id": entity_id}
+        return service, service_data
+
+    async def _async_command(self, entity_id: str, on: bool) -> bool:
+        """Switch one heating control, returning False if it failed."""
+        if entity_id == self._boiler:
+            return True
+        health = self._health[entity_id]
+        now = self.hass.loop.time()
+        state = self.hass.states.get(entity_id)
+        if state is not None and state.state == STATE_UNAVAILABLE:
+            health.record_failure(now, STATE_UNAVAILABLE)
+            return False
+
+        service, service_data = self._service_call(entity_id, on)
+        try:
+            settled = await self._commander.async_send(
+                service.split(".")[0], service.split(".")[1], service_data
+            )
+        except HomeAssistantError as err:
+            _LOGGER.warning("%s: %s failed: %s", self._attr_name, service, err)
+            health.record_failure(now, str(err))
+            return False
+        if settled:
+            # A held back command has not succeeded yet
+            health.record_success(now)
+        return True
@@ -1,13 +1,235 @@
 from __future__ import annotations
 
+from uuid import uuid4
+
 import voluptuous as vol
 from homeassistant import config_entries
+from homeassistant.core import callback
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.selector import (
+    BooleanSelector,
     EntitySelector,
     EntitySelectorConfig,
+    NumberSelector,
+    NumberSelectorConfig,
+    NumberSelectorMode,
+    ObjectSelector,
+    SelectOptionDict,
+    SelectSelector,
+    SelectSelectorConfig,
+)
+
+from .const import (
+    AGGREGATIONS,
+    CONF_ACTUATOR_MIN_INTERVAL,
+    CONF_BACKUP_STAGE_DELAY,
+    CONF_BOILER,
+    CONF_BOILER_MIN_DEMAND,
+    CONF_BOILER_MIN_OFF_TIME,
+    CONF_BOILER_MIN_ON_TIME,
+    CONF_COALESCE_WINDOW,
+    CONF_CONTROL_MODE,
+    CONF_CYCLE_PERIOD,
+    CONF_DEMAND_PRIORITY,
+    CONF_HUB_NAME,
+    CONF_HYSTERESIS,
+    CONF_KD,
+    CONF_KI,
+    CONF_KP,
+    CONF_MAX_LATENCY,
+    CONF_MAX_PREHEAT,
+    CONF_MAX_SENSOR_AGE,
+    CONF_METRICS_SAMPLE_RATE,
+    CONF_MIN_OFF_TIME,
+    CONF_MIN_ON_TIME,
+    CONF_OPEN_WINDOW_DROP,
+    CONF_OPEN_WINDOW_PAUSE,
+    CONF_SCHEDULE,
+    CONF_SLOW_CALLBACK_THRESHOLD,
+    CONF_SUPPRESS_UNCHANGED,
+    CONF_TEMP_AGGREGATION,
+    CONF_TRIM_FRACTION,
+    CONF_TRV_WEIGHTS,
+    CONF_ZONE_ID,
+    CONF_ZONES,
+    CONTROL_MODES,
+    DEFAULT_ACTUATOR_MIN_INTERVAL,
+    DEFAULT_BACKUP_STAGE_DELAY,
+    DEFAULT_BOILER_MIN_DEMAND,
+    DEFAULT_BOILER_MIN_OFF_TIME,
+    DEFAULT_BOILER_MIN_ON_TIME,
+    DEFAULT_COALESCE_WINDOW,
+    DEFAULT_CONTROL_MODE,
+    DEFAULT_CYCLE_PERIOD,
+    DEFAULT_DEMAND_PRIORITY,
+    DEFAULT_HYSTERESIS,
+    DEFAULT_KD,
+    DEFAULT_KI,
+    DEFAULT_KP,
+    DEFAULT_MAX_LATENCY,
+    DEFAULT_MAX_PREHEAT,
+    DEFAULT_MAX_SENSOR_AGE,
+    DEFAULT_METRICS_SAMPLE_RATE,
+    DEFAULT_MIN_OFF_TIME,
+    DEFAULT_MIN_ON_TIME,
+    DEFAULT_OPEN_WINDOW_DROP,
+    DEFAULT_OPEN_WINDOW_PAUSE,
+    DEFAULT_SLOW_CALLBACK_THRESHOLD,
+    DEFAULT_SUPPRESS_UNCHANGED,
+    DEFAULT_TEMP_AGGREGATION,
+    DEFAULT_TRIM_FRACTION,
+    DOMAIN,
+)
+
+
+def _number(minimum, maximum, step, unit=None):
+    """Return a numeric input box selector."""
+    config = NumberSelectorConfig(
+        min=minimum, max=maximum, step=step, mode=NumberSelectorMode.BOX
+    )
+    if unit:
+        # The selector rejects an empty unit
+        config["unit_of_measurement"] = unit
+    return NumberSelector(config)
+
+
+def _priority_field():
+    """Return the hub zone field for the zone's share of the boiler demand."""
+    return {
+        vol.Optional(
+            CONF_DEMAND_PRIORITY, default=DEFAULT_DEMAND_PRIORITY
+        ): _number(0, 10, 0.1)
+    }
+
+
+# {entity_id: weight}, the object selector accepts any YAML
+TRV_WEIGHTS_SCHEMA = vol.Schema(
+    {cv.entity_id: vol.All(vol.Coerce(float), vol.Range(min=0))}
 )
 
-from .const import DOMAIN
+
+def _validate_zone(user_input) -> dict[str, str]:
+    """Check what the selectors cannot and return the form errors."""
+    errors = {}
+    if CONF_TRV_WEIGHTS in user_input:
+        try:
+            user_input[CONF_TRV_WEIGHTS] = TRV_WEIGHTS_SCHEMA(
+                user_input[CONF_TRV_WEIGHTS]
+            )
+        except vol.Invalid:
+            errors[CONF_TRV_WEIGHTS] = "invalid_trv_weights"
+    return errors
+
+
+def _zone_schema(extra=None):
+    """Return the form schema for one zone."""
+    return vol.Schema(
+        {
+            vol.Required("zone_name"): str,
+
+            # Room sensors
+            vol.Optional("zone_temp_sensor"): EntitySelector(
+                EntitySelectorConfig(domain="sensor")
+            ),
+            vol.Optional("zone_humidity_sensor"): EntitySelector(
+                EntitySelectorConfig(domain="sensor")
+            ),
+
+            # TRV fallback sensors (multi select)
+            vol.Optional("trv_temp_sensors"): EntitySelector(
+                EntitySelectorConfig(domain="sensor", multiple=True)
+            ),
+            vol.Optional("trv_humidity_sensors"): EntitySelector(
+                EntitySelectorConfig(domain="sensor", multiple=True)
+            ),
+
+            # How TRV temperatures are combined, with optional per-TRV
+            # weights ({entity_id: weight}) for the weighted strategy
+            vol.Optional(
+                CONF_TEMP_AGGREGATION, default=DEFAULT_TEMP_AGGREGATION
+            ): SelectSelector(SelectSelectorConfig(options=AGGREGATIONS)),
+            vol.Optional(
+                CONF_TRIM_FRACTION, default=DEFAULT_TRIM_FRACTION
+            ): _number(0, 0.45, 0.05),
+            vol.Optional(CONF_TRV_WEIGHTS): ObjectSelector(),
+
+            # Treat readings not reported for this long as missing (0 = off)
+            vol.Optional(
+                CONF_MAX_SENSOR_AGE, default=DEFAULT_MAX_SENSOR_AGE
+            ): _number(0, 1440, 5, "min"),
+
+            # Heating controls (climate or switch)
+            vol.Required("primary_heating_control"): EntitySelector(
+                EntitySelectorConfig(domain=["climate", "switch"])
+            ),
+            vol.Optional("backup_heating_control"): EntitySelector(
+                EntitySelectorConfig(domain=["climate", "switch"])
+            ),
+            vol.Optional(
+                CONF_BACKUP_STAGE_DELAY, default=DEFAULT_BACKUP_STAGE_DELAY
+            ): _number(0, 240, 1, "min"),
+
+            # Sensor burst coalescing (ms)
+            vol.Optional(
+                CONF_COALESCE_WINDOW, default=DEFAULT_COALESCE_WINDOW
+            ): _number(0, 5000, 50, "ms"),
+            vol.Optional(
+                CONF_MAX_LATENCY, default=DEFAULT_MAX_LATENCY
+            ): _number(0, 30000, 50, "ms"),
+            vol.Optional(
+                CONF_ACTUATOR_MIN_INTERVAL,
+                default=DEFAULT_ACTUATOR_MIN_INTERVAL,
+            ): _number(0, 300, 1, "s"),
+            vol.Optional(
+                CONF_SUPPRESS_UNCHANGED, default=DEFAULT_SUPPRESS_UNCHANGED
+            ): BooleanSelector(),
+            vol.Optional(
+                CONF_METRICS_SAMPLE_RATE, default=DEFAULT_METRICS_SAMPLE_RATE
+            ): _number(1, 1000, 1),
+            vol.Optional(
+                CONF_SLOW_CALLBACK_THRESHOLD,
+                default=DEFAULT_SLOW_CALLBACK_THRESHOLD,
+            ): _number(1, 1000, 1, "ms"),
+
+            # Closed-loop control of the primary heating control
+            vol.Optional(
+                CONF_CONTROL_MODE, default=DEFAULT_CONTROL_MODE
+            ): SelectSelector(
+                SelectSelectorConfig(options=CONTROL_MODES)
+            ),
+            vol.Optional(
+                CONF_HYSTERESIS, default=DEFAULT_HYSTERESIS
+            ): _number(0.1, 5, 0.1, "°C"),
+            vol.Optional(
+                CONF_MIN_ON_TIME, default=DEFAULT_MIN_ON_TIME
+            ): _number(0, 3600, 10, "s"),
+            vol.Optional(
+                CONF_MIN_OFF_TIME, default=DEFAULT_MIN_OFF_TIME
+            ): _number(0, 3600, 10, "s"),
+            vol.Optional(CONF_KP, default=DEFAULT_KP): _number(0, 10, 0.01),
+            vol.Optional(CONF_KI, default=DEFAULT_KI): _number(0, 1, 0.001),
+            vol.Optional(CONF_KD, default=DEFAULT_KD): _number(0, 10, 0.01),
+            vol.Optional(
+                CONF_CYCLE_PERIOD, default=DEFAULT_CYCLE_PERIOD
+            ): _number(60, 3600, 10, "s"),
+
+            # Daily setpoint schedule, e.g. [{time: "06:30", temperature: 21}]
+            vol.Optional(CONF_SCHEDULE): ObjectSelector(),
+            vol.Optional(
+                CONF_MAX_PREHEAT, default=DEFAULT_MAX_PREHEAT
+            ): _number(0, 480, 5, "min"),
+
+            # Open window: temperature drop over 5 minutes that signals one,
+            # and how long heating pauses for it (0 = only report it)
+            vol.Optional(
+                CONF_OPEN_WINDOW_DROP, default=DEFAULT_OPEN_WINDOW_DROP
+            ): _number(0.2, 5, 0.1, "°C"),
+            vol.Optional(
+                CONF_OPEN_WINDOW_PAUSE, default=DEFAULT_OPEN_WINDOW_PAUSE
+            ): _number(0, 240, 1, "min"),
+        }
+        | (extra or {})
+    )
 
 
 class ZoneClimateConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -15,43 +237,169 @@ class ZoneClimateConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Return the flow that changes the zones of an entry."""
+        return ZoneClimateOptionsFlow(config_entry)
+
+    def __init__(self):
+        """Initialize the flow."""
+        self._hub = {}
+        self._zones = []
+
     async def async_step_user(self, user_input=None):
-        """Step 1: user input."""
+        """Step 1: choose a single zone or a hub of zones."""
+        return self.async_show_menu(
+            step_id="user",
+            menu_options={
+                "zone": "Single zone",
+                "hub": "Hub (many zones in one entry)",
+            },
+        )
+
+    async def async_step_zone(self, user_input=None):
+        """Single zone: user input."""
+        errors = {}
         if user_input is not None:
-            return self.async_create_entry(
-                title=user_input["zone_name"],
-                data=user_input,
-            )
+            if not (errors := _validate_zone(user_input)):
+                return self.async_create_entry(
+                    title=user_input["zone_name"],
+                    data=user_input,
+                )
 
         return self.async_show_form(
-            step_id="user",
+            step_id="zone",
+            data_schema=self.add_suggested_values_to_schema(
+                _zone_schema(), user_input or {}
+            ),
+            errors=errors,
+        )
+
+    async def async_step_hub(self, user_input=None):
+        """Hub: name the hub."""
+        if user_input is not None:
+            self._hub = user_input
+            return await self.async_step_hub_zone()
+
+        return self.async_show_form(
+            step_id="hub",
             data_schema=vol.Schema(
                 {
-                    vol.Required("zone_name"): str,
+                    vol.Required(CONF_HUB_NAME): str,
 
-                    # Room sensors
-                    vol.Optional("zone_temp_sensor"): EntitySelector(
-                        EntitySelectorConfig(domain="sensor")
-                    ),
-                    vol.Optional("zone_humidity_sensor"): EntitySelector(
-                        EntitySelectorConfig(domain="sensor")
+                    # Whole-house boiler fired from the demand of all zones
+                    vol.Optional(CONF_BOILER): EntitySelector(
+                        EntitySelectorConfig(domain=["climate", "switch"])
                     ),
+                    vol.Optional(
+                        CONF_BOILER_MIN_DEMAND, default=DEFAULT_BOILER_MIN_DEMAND
+                    ): _number(0.1, 10, 0.1),
+                    vol.Optional(
+                        CONF_BOILER_MIN_ON_TIME, default=DEFAULT_BOILER_MIN_ON_TIME
+                    ): _number(0, 3600, 10, "s"),
+                    vol.Optional(
+                        CONF_BOILER_MIN_OFF_TIME, default=DEFAULT_BOILER_MIN_OFF_TIME
+                    ): _number(0, 3600, 10, "s"),
+                }
+            ),
+        )
 
-                    # TRV fallback sensors (multi select)
-                    vol.Optional("trv_temp_sensors"): EntitySelector(
-                        EntitySelectorConfig(domain="sensor", multiple=True)
-                    ),
-                    vol.Optional("trv_humidity_sensors"): EntitySelector(
-                        EntitySelectorConfig(domain="sensor", multiple=True)
-                    ),
+    async def async_step_hub_zone(self, user_input=None):
+        """Hub: add zones one at a time."""
+        errors = {}
+        if user_input is not None and not (errors := _validate_zone(user_input)):
+            add_another = user_input.pop("add_another")
+            self._zones.append({**user_input, CONF_ZONE_ID: uuid4().hex})
+            if not add_another:
+                return self.async_create_entry(
+                    title=self._hub[CONF_HUB_NAME],
+                    data={**self._hub, CONF_ZONES: self._zones},
+                )
+            user_input = None
 
-                    # Heating controls (climate or switch)
-                    vol.Required("primary_heating_control"): EntitySelector(
-                        EntitySelectorConfig(domain=["climate", "switch"])
-                    ),
-                    vol.Optional("backup_heating_control"): EntitySelector(
-                        EntitySelectorConfig(domain=["climate", "switch"])
-                    ),
+        return self.async_show_form(
+            step_id="hub_zone",
+            data_schema=self.add_suggested_values_to_schema(
+                _zone_schema(
+                    _priority_field()
+                    | {vol.Optional("add_another", default=False): BooleanSelector()}
+                ),
+                user_input or {},
+            ),
+            errors=errors,
+        )
+
+
+class ZoneClimateOptionsFlow(config_entries.OptionsFlow):
+    """Change the zones of an entry after it has been set up."""
+
+    def __init__(self, config_entry):
+        """Initialize the flow."""
+        self._entry = config_entry
+        self._zone_id = None
+
+    async def async_step_init(self, user_input=None):
+        """Hub: choose the zone to change."""
+        if CONF_ZONES not in self._entry.data:
+            return await self.async_step_zone()
+        if user_input is not None:
+            self._zone_id = user_input[CONF_ZONE_ID]
+            return await self.async_step_zone()
+
+        zones = [
+            SelectOptionDict(value=zone[CONF_ZONE_ID], label=zone["zone_name"])
+            for zone in self._entry.data[CONF_ZONES]
+        ]
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_ZONE_ID): SelectSelector(
+                        SelectSelectorConfig(options=zones)
+                    )
                 }
             ),
         )
+
+    async def async_step_zone(self, user_input=None):
+        """Change one zone, prefilled with its current options."""
+        data = self._entry.data
+        if self._zone_id is None:
+            current, extra = data, None
+        else:
+            current = next(
+                zone
+                for zone in data[CONF_ZONES]
+                if zone[CONF_ZONE_ID] == self._zone_id
+            )
+            extra = _priority_field()
+
+        errors = {}
+        if user_input is not None and not (errors := _validate_zone(user_input)):
+            if self._zone_id is None:
+                title, new = user_input["zone_name"], user_input
+            else:
+                zone = {**user_input, CONF_ZONE_ID: self._zone_id}
+                title = self._entry.title
+                new = {
+                    **data,
+                    CONF_ZONES: [
+                        zone if other[CONF_ZONE_ID] == self._zone_id else other
+                        for other in data[CONF_ZONES]
+                    ],
+                }
+            # The entry's update listener applies the change, in place
+            # where the running zone allows it
+            self.hass.config_entries.async_update_entry(
+                self._entry, title=title, data=new
+            )
+            return self.async_create_entry(title="", data={})
+
+        return self.async_show_form(
+            step_id="zone",
+            data_schema=self.add_suggested_values_to_schema(
+                _zone_schema(extra), user_input or current
+            ),
+            errors=errors,
+        )
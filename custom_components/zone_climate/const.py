@@ -1,2 +1,152 @@
-TEMP_CELSIUS = "C"
+from homeassistant.const import UnitOfTemperature
+
+# Canonical unit: temperature readings are converted to it on ingestion
+TEMP_CELSIUS = UnitOfTemperature.CELSIUS
 DOMAIN = "zone_climate"
+
+# Coalescing of bursts of sensor reports, in milliseconds
+CONF_COALESCE_WINDOW = "coalesce_window"
+CONF_MAX_LATENCY = "max_latency"
+DEFAULT_COALESCE_WINDOW = 250
+DEFAULT_MAX_LATENCY = 1000
+
+# Skip sensor state writes when the rounded value and source are unchanged
+CONF_SUPPRESS_UNCHANGED = "suppress_unchanged"
+DEFAULT_SUPPRESS_UNCHANGED = True
+SUPPRESS_PRECISION = 1
+
+# Minimum time between two commands to the same actuator, in seconds
+CONF_ACTUATOR_MIN_INTERVAL = "actuator_min_interval"
+DEFAULT_ACTUATOR_MIN_INTERVAL = 5
+
+# Closed-loop control of the primary heating actuator
+CONF_CONTROL_MODE = "control_mode"
+CONTROL_MODE_SETPOINT = "setpoint"
+CONTROL_MODE_HYSTERESIS = "hysteresis"
+CONTROL_MODE_PID = "pid"
+CONTROL_MODES = [CONTROL_MODE_SETPOINT, CONTROL_MODE_HYSTERESIS, CONTROL_MODE_PID]
+DEFAULT_CONTROL_MODE = CONTROL_MODE_SETPOINT
+
+CONF_HYSTERESIS = "hysteresis"
+CONF_MIN_ON_TIME = "min_on_time"
+CONF_MIN_OFF_TIME = "min_off_time"
+CONF_KP = "kp"
+CONF_KI = "ki"
+CONF_KD = "kd"
+CONF_CYCLE_PERIOD = "cycle_period"
+DEFAULT_HYSTERESIS = 0.5
+DEFAULT_MIN_ON_TIME = 300
+DEFAULT_MIN_OFF_TIME = 300
+DEFAULT_KP = 0.5
+DEFAULT_KI = 0.01
+DEFAULT_KD = 0.0
+DEFAULT_CYCLE_PERIOD = 900
+
+# Controller evaluation tick, in seconds
+CONTROL_INTERVAL = 30
+
+# Staged backup heating: bring in the backup after the primary has failed
+# to close the error for this many minutes (0 disables staging)
+CONF_BACKUP_STAGE_DELAY = "backup_stage_delay"
+DEFAULT_BACKUP_STAGE_DELAY = 30
+BACKUP_STAGE_MARGIN = 0.5
+
+BACKUP_REASON_STAGED = "staged"
+BACKUP_REASON_FAILOVER = "failover"
+
+# Hub entries hold many zones under a single config entry
+CONF_HUB_NAME = "hub_name"
+CONF_ZONES = "zones"
+CONF_ZONE_ID = "zone_id"
+
+# How TRV temperatures are combined when the room sensor is unavailable
+CONF_TEMP_AGGREGATION = "temp_aggregation"
+CONF_TRV_WEIGHTS = "trv_weights"
+CONF_TRIM_FRACTION = "trim_fraction"
+AGGREGATION_MEAN = "mean"
+AGGREGATION_MEDIAN = "median"
+AGGREGATION_TRIMMED_MEAN = "trimmed_mean"
+AGGREGATION_WEIGHTED = "weighted"
+AGGREGATION_MIN = "min"
+AGGREGATION_MAX = "max"
+AGGREGATIONS = [
+    AGGREGATION_MEAN,
+    AGGREGATION_MEDIAN,
+    AGGREGATION_TRIMMED_MEAN,
+    AGGREGATION_WEIGHTED,
+    AGGREGATION_MIN,
+    AGGREGATION_MAX,
+]
+DEFAULT_TEMP_AGGREGATION = AGGREGATION_MEAN
+DEFAULT_TRIM_FRACTION = 0.25
+
+# Readings not reported within this many minutes are treated as missing
+# (0 disables the check)
+CONF_MAX_SENSOR_AGE = "max_sensor_age"
+DEFAULT_MAX_SENSOR_AGE = 0
+
+# Shared timer wheel expiring stale readings: tick in seconds, bucket count
+FRESHNESS_RESOLUTION = 30
+FRESHNESS_SLOTS = 128
+
+# Instrumentation: hot paths are timed once every N calls, and any timed
+# call slower than the threshold (milliseconds) is logged
+CONF_METRICS_SAMPLE_RATE = "metrics_sample_rate"
+DEFAULT_METRICS_SAMPLE_RATE = 10
+CONF_SLOW_CALLBACK_THRESHOLD = "slow_callback_threshold"
+DEFAULT_SLOW_CALLBACK_THRESHOLD = 50
+
+# Zone snapshot kept across restarts: debounce delays for control state
+# and for readings, and the oldest readings (seconds) still restored when
+# no max sensor age is set
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 30
+STORAGE_READINGS_SAVE_DELAY = 600
+RESTORE_MAX_AGE = 3600
+SOURCE_RESTORED = "Restored"
+
+# Optimum start: a daily schedule of setpoints, reached on time by starting
+# early from the zone's learned heat-up rate (lead time capped, minutes)
+CONF_SCHEDULE = "schedule"
+CONF_MAX_PREHEAT = "max_preheat"
+DEFAULT_MAX_PREHEAT = 120
+
+# Heat-up rate regression: ring size, and the samples and minutes a
+# heating run needs before its slope is used
+HEAT_RATE_SAMPLES = 60
+HEAT_RATE_MIN_SAMPLES = 10
+HEAT_RATE_MIN_SPAN = 5
+
+# Actuator calls of all zones of an entry: concurrent calls and the
+# timeout of each call, in seconds
+DISPATCH_MAX_CONCURRENT = 8
+DISPATCH_TIMEOUT = 10
+
+# Rolling in-memory history: sample interval and the window of the
+# temperature rate of change, in seconds
+HISTORY_INTERVAL = 60
+HISTORY_RATE_WINDOW = 900
+
+# Open window detection: a fall of at least the drop (degrees) over the
+# period (seconds), with the room at least the variation below the TRVs,
+# pauses heating for the pause (minutes, 0 only reports the window)
+CONF_OPEN_WINDOW_DROP = "open_window_drop"
+CONF_OPEN_WINDOW_PAUSE = "open_window_pause"
+DEFAULT_OPEN_WINDOW_DROP = 1.0
+DEFAULT_OPEN_WINDOW_PAUSE = 15
+OPEN_WINDOW_PERIOD = 300
+OPEN_WINDOW_VARIATION = 1.0
+OPEN_WINDOW_MIN_SPAN = 60
+
+# Whole-house boiler of a hub: each zone calling for heat adds its demand
+# priority, the boiler fires once the total reaches the minimum demand and
+# holds each on and off period for the minimum times (seconds)
+CONF_BOILER = "boiler"
+CONF_BOILER_MIN_DEMAND = "boiler_min_demand"
+CONF_BOILER_MIN_ON_TIME = "boiler_min_on_time"
+CONF_BOILER_MIN_OFF_TIME = "boiler_min_off_time"
+CONF_DEMAND_PRIORITY = "demand_priority"
+DEFAULT_BOILER_MIN_DEMAND = 1.0
+DEFAULT_BOILER_MIN_ON_TIME = 300
+DEFAULT_BOILER_MIN_OFF_TIME = 300
+DEFAULT_DEMAND_PRIORITY = 1.0
@@ -0,0 +1,224 @@
+"""Closed-loop heating controllers.
+
+These are plain Python so they can be exercised without Home Assistant:
+feed them the zone temperature, the target and a monotonic time in
+seconds, and they return whether the actuator should be heating.
+"""
+from __future__ import annotations
+
+
+class Controller:
+    """Base controller enforcing minimum on and off cycle times."""
+
+    def __init__(self, min_on: float, min_off: float):
+        """Initialize the controller."""
+        self.min_on = min_on
+        self.min_off = min_off
+        self.heating = False
+        self.cycles = 0
+        self._last_switch: float | None = None
+
+    def reset(self):
+        """Forget all controller state, leaving the actuator off."""
+        self.heating = False
+        self._last_switch = None
+
+    def as_dict(self) -> dict:
+        """Return the state worth keeping across a restart."""
+        return {"heating": self.heating, "cycles": self.cycles}
+
+    def restore(self, data: dict):
+        """Resume from a saved state. Cycle timers start afresh."""
+        self.heating = data.get("heating", False)
+        self.cycles = data.get("cycles", 0)
+
+    def update(self, current: float | None, target: float, now: float) -> bool:
+        """Return whether the actuator should be heating."""
+        if current is None:
+            # No reading to act on, fail safe
+            want = False
+        else:
+            want = self._demand(current, target, now)
+        if want != self.heating and self._can_switch(now):
+            self.heating = want
+            self._last_switch = now
+            if want:
+                self.cycles += 1
+        return self.heating
+
+    def _can_switch(self, now: float) -> bool:
+        """Return True once the current on or off period has run long enough."""
+        if self._last_switch is None:
+            return True
+        held = now - self._last_switch
+        return held >= (self.min_on if self.heating else self.min_off)
+
+    def _demand(self, current: float, target: float, now: float) -> bool:
+        raise NotImplementedError
+
+
+class HysteresisController(Controller):
+    """Bang-bang control around the target within a hysteresis band."""
+
+    def __init__(self, hysteresis: float, min_on: float, min_off: float):
+        """Initialize the controller."""
+        super().__init__(min_on, min_off)
+        self.hysteresis = hysteresis
+
+    def _demand(self, current: float, target: float, now: float) -> bool:
+        half_band = self.hysteresis / 2
+        if current <= target - half_band:
+            return True
+        if current >= target + half_band:
+            return False
+        return self.heating
+
+
+class PIDController(Controller):
+    """PID control for switch actuators using time-proportioned cycles.
+
+    The PID output (0..1) is the fraction of each cycle the actuator is on.
+    The output is clamped and the integral only accumulates while the output
+    is not saturated, so the loop cannot wind up. Gains are per degree of
+    error, with the integral and derivative measured in minutes.
+    """
+
+    def __init__(
+        self,
+        kp: float,
+        ki: float,
+        kd: float,
+        cycle_period: float,
+        min_on: float,
+        min_off: float,
+    ):
+        """Initialize the controller."""
+        super().__init__(min_on, min_off)
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.cycle_period = cycle_period
+        self.output = 0.0
+        self._integral = 0.0
+        self._last_error: float | None = None
+        self._last_time: float | None = None
+        self._cycle_start: float | None = None
+        self._on_time = 0.0
+
+    def reset(self):
+        """Forget all controller state, leaving the actuator off."""
+        super().reset()
+        self.output = 0.0
+        self._integral = 0.0
+        self._last_error = None
+        self._last_time = None
+        self._cycle_start = None
+        self._on_time = 0.0
+
+    def as_dict(self) -> dict:
+        """Return the state worth keeping across a restart."""
+        # Rounded, so a settled loop does not look changed on every update
+        return super().as_dict() | {
+            "output": round(self.output, 3),
+            "integral": round(self._integral, 2),
+        }
+
+    def restore(self, data: dict):
+        """Resume from a saved state, keeping the integral term."""
+        super().restore(data)
+        self.output = data.get("output", 0.0)
+        self._integral = data.get("integral", 0.0)
+
+    def _demand(self, current: float, target: float, now: float) -> bool:
+        error = target - current
+        self._compute_output(error, now)
+
+        if self._cycle_start is None or now - self._cycle_start >= self.cycle_period:
+            self._start_cycle(now)
+        return now - self._cycle_start < self._on_time
+
+    def _compute_output(self, error: float, now: float):
+        """Advance the PID terms and update the clamped output."""
+        minutes = 0.0
+        if self._last_time is not None:
+            minutes = (now - self._last_time) / 60
+        derivative = 0.0
+        if minutes > 0 and self._last_error is not None:
+            derivative = (error - self._last_error) / minutes
+
+        integral = self._integral + error * minutes
+        raw = self.kp * error + self.ki * integral + self.kd * derivative
+        self.output = min(max(raw, 0.0), 1.0)
+        # Anti-windup: keep integrating only while that does not push
+        # further into saturation
+        if raw == self.output or (raw > 1.0) == (error < 0):
+            self._integral = integral
+
+        self._last_error = error
+        self._last_time = now
+
+    def _start_cycle(self, now: float):
+        """Fix the on time for the next cycle from the current output."""
+        self._cycle_start = now
+        on_time = self.output * self.cycle_period
+        # Pulses too short to honour the minimum cycle times are rounded
+        # to fully off or fully on
+        if on_time < self.min_on:
+            on_time = 0.0
+        elif self.cycle_period - on_time < self.min_off:
+            on_time = self.cycle_period
+        self._on_time = on_time
+
+
+class BoilerDemand(Controller):
+    """Whole-house boiler demand from the heat demand of a hub's zones.
+
+    Each zone calling for heat adds its priority to a running total that is
+    adjusted as single zones change, so an update never scans the zones.
+    The boiler fires while the total reaches the minimum demand, holding
+    each on and off period for the minimum times against short cycling.
+    """
+
+    def __init__(self, min_demand: float, min_on: float, min_off: float):
+        """Initialize with no zone calling for heat."""
+        super().__init__(min_on, min_off)
+        self.min_demand = min_demand
+        self.total = 0.0
+        self._zones: dict[str, float] = {}
+
+    @property
+    def zones(self) -> int:
+        """Return the number of zones calling for heat."""
+        return len(self._zones)
+
+    def set_zone(self, zone_id: str, priority: float | None) -> bool:
+        """Set a zone's demand, None when it is not calling for heat.
+
+        Returns True if the total demand changed.
+        """
+        old = self._zones.pop(zone_id, None)
+        if priority is not None:
+            self._zones[zone_id] = priority
+        if priority == old:
+            return False
+        self.total += (priority or 0.0) - (old or 0.0)
+        if not self._zones:
+            self.total = 0.0
+        return True
+
+    def decide(self, now: float) -> bool:
+        """Return whether the boiler should fire."""
+        return self.update(self.total, self.min_demand, now)
+
+    def switch_at(self) -> float | None:
+        """Return when the boiler may switch, if it is held against demand."""
+        if self._last_switch is None or self.heating == self._wanted:
+            return None
+        return self._last_switch + (self.min_on if self.heating else self.min_off)
+
+    @property
+    def _wanted(self) -> bool:
+        return self.total >= self.min_demand and self.total > 0
+
+    def _demand(self, current: float, target: float, now: float) -> bool:
+        return self._wanted
@@ -0,0 +1,581 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+
+from homeassistant.const import ATTR_UNIT_OF_MEASUREMENT
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import dt as dt_util
+from homeassistant.util.unit_conversion import TemperatureConverter
+
+from .aggregation import SensorGroup
+from .const import (
+    CONF_COALESCE_WINDOW,
+    CONF_DEMAND_PRIORITY,
+    CONF_MAX_LATENCY,
+    CONF_MAX_SENSOR_AGE,
+    CONF_METRICS_SAMPLE_RATE,
+    CONF_OPEN_WINDOW_DROP,
+    CONF_OPEN_WINDOW_PAUSE,
+    CONF_SLOW_CALLBACK_THRESHOLD,
+    CONF_TEMP_AGGREGATION,
+    CONF_TRIM_FRACTION,
+    CONF_TRV_WEIGHTS,
+    DEFAULT_COALESCE_WINDOW,
+    DEFAULT_DEMAND_PRIORITY,
+    DEFAULT_MAX_LATENCY,
+    DEFAULT_MAX_SENSOR_AGE,
+    DEFAULT_METRICS_SAMPLE_RATE,
+    DEFAULT_OPEN_WINDOW_DROP,
+    DEFAULT_OPEN_WINDOW_PAUSE,
+    DEFAULT_SLOW_CALLBACK_THRESHOLD,
+    DEFAULT_TEMP_AGGREGATION,
+    DEFAULT_TRIM_FRACTION,
+    HISTORY_INTERVAL,
+    HISTORY_RATE_WINDOW,
+    OPEN_WINDOW_MIN_SPAN,
+    OPEN_WINDOW_PERIOD,
+    OPEN_WINDOW_VARIATION,
+    RESTORE_MAX_AGE,
+    SOURCE_RESTORED,
+    STORAGE_READINGS_SAVE_DELAY,
+    SUPPRESS_PRECISION,
+    TEMP_CELSIUS,
+)
+from .freshness import TimerWheel, reading_time
+from .history import ZoneHistory, dew_point
+from .metrics import ZoneMetrics
+from .open_window import OpenWindowDetector
+
+_LOGGER = logging.getLogger(__name__)
+
+INVALID_STATES = (None, "unknown", "unavailable")
+
+
+@dataclass
+class ZoneData:
+    """Aggregated readings for a zone, shared by all of its entities."""
+
+    temperature: float | None = None
+    humidity: float | None = None
+    temp_source: str | None = None
+    humidity_source: str | None = None
+    temp_variation: float | None = None
+    humidity_variation: float | None = None
+    temp_age: float | None = None
+    humidity_age: float | None = None
+    temp_rate: float | None = None
+    temp_mean_1h: float | None = None
+    temp_mean_24h: float | None = None
+    humidity_mean_24h: float | None = None
+    heating_duty: float | None = None
+    dew_point: float | None = None
+    open_window: bool = False
+
+
+class SensorSource:
+    """One source entity of a zone, compiled at setup.
+
+    Holds the groups the entity feeds and the last state object seen with
+    its parsed value, so a state is parsed once however often it is
+    delivered (state_reported events and full refreshes reuse it). The
+    conversion from the entity's unit to the canonical unit is looked up
+    once and kept until the entity reports a different unit.
+    """
+
+    __slots__ = (
+        "entity_id",
+        "groups",
+        "canonical_unit",
+        "unit",
+        "convert",
+        "state",
+        "value",
+        "reported",
+    )
+
+    def __init__(
+        self,
+        entity_id: str,
+        groups: tuple[SensorGroup, ...],
+        canonical_unit: str | None = None,
+    ):
+        self.entity_id = entity_id
+        self.groups = groups
+        self.canonical_unit = canonical_unit
+        self.unit: str | None = None
+        self.convert = None
+        self.state = None
+        self.value: float | None = None
+        self.reported: float | None = None
+
+    def set_unit(self, unit: str | None):
+        """Pick the conversion for a newly reported unit."""
+        self.unit = unit
+        self.convert = None
+        if self.canonical_unit is None or unit in (None, self.canonical_unit):
+            return
+        if unit in TemperatureConverter.VALID_UNITS:
+            self.convert = TemperatureConverter.converter_factory(
+                unit, self.canonical_unit
+            )
+        else:
+            _LOGGER.warning(
+                "%s reports unsupported unit %s, using its values as %s",
+                self.entity_id,
+                unit,
+                self.canonical_unit,
+            )
+
+
+class ZoneClimateCoordinator(DataUpdateCoordinator[ZoneData]):
+    """Compute a zone's readings once and push them to every zone entity.
+
+    Readings are held in incremental SensorGroup aggregates, so a state
+    change costs a constant amount of work regardless of the TRV count.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        zone_id: str,
+        config: dict,
+        wheel: TimerWheel,
+        schedule_save: Callable[..., None],
+        demand_changed: Callable[[ZoneClimateCoordinator], None],
+    ):
+        """Initialize the coordinator from a zone's configuration."""
+        super().__init__(hass, _LOGGER, name=config["zone_name"])
+        self.zone_id = zone_id
+        self.config = config
+        self.schedule_save = schedule_save
+        self._demand_changed = demand_changed
+        self.demand_priority = config.get(
+            CONF_DEMAND_PRIORITY, DEFAULT_DEMAND_PRIORITY
+        )
+
+        # Warm restart: readings from the last snapshot stand in until the
+        # first live reading, the climate entity keeps its own state here
+        self.climate_state: dict = {}
+        self._restored: dict[str, float] = {}
+        self._saved_readings: dict[str, list[float]] = {}
+
+        self._setup_sources(config)
+
+        # Bursts of reports are merged into one push within this window,
+        # but a change is never held back longer than the latency cap
+        self._coalesce_window = (
+            config.get(CONF_COALESCE_WINDOW, DEFAULT_COALESCE_WINDOW) / 1000
+        )
+        self._max_latency = max(
+            config.get(CONF_MAX_LATENCY, DEFAULT_MAX_LATENCY) / 1000,
+            self._coalesce_window,
+        )
+        self._flush_handle = None
+        self._first_change = 0.0
+        self._last_change = 0.0
+
+        # Readings older than max_age are expired through the hub's
+        # shared timer wheel and treated as missing
+        self.max_age = config.get(CONF_MAX_SENSOR_AGE, DEFAULT_MAX_SENSOR_AGE) * 60
+        self._wheel = wheel
+
+        # Fixed-size rolling history behind the derived sensors; whether
+        # the zone is heating is kept up to date by its climate entity
+        self.history = ZoneHistory(HISTORY_INTERVAL, HISTORY_RATE_WINDOW)
+        self._heating = False
+
+        # Open window detection on the pushed zone temperature; a detection
+        # reports the window open for the pause time (or the detection
+        # period when pausing is off)
+        self.open_window_pause = (
+            config.get(CONF_OPEN_WINDOW_PAUSE, DEFAULT_OPEN_WINDOW_PAUSE) * 60
+        )
+        self._window = OpenWindowDetector(
+            OPEN_WINDOW_PERIOD,
+            config.get(CONF_OPEN_WINDOW_DROP, DEFAULT_OPEN_WINDOW_DROP),
+            OPEN_WINDOW_VARIATION,
+            OPEN_WINDOW_MIN_SPAN,
+        )
+        self.window_detections = 0
+        self.window_last_detected: datetime | None = None
+        self._window_open_until = 0.0
+        self._window_handle = None
+
+        self.recomputations_avoided = 0
+        self.expired_readings = 0
+        self.metrics = ZoneMetrics(
+            self.name,
+            config.get(CONF_METRICS_SAMPLE_RATE, DEFAULT_METRICS_SAMPLE_RATE),
+            config.get(CONF_SLOW_CALLBACK_THRESHOLD, DEFAULT_SLOW_CALLBACK_THRESHOLD)
+            / 1000,
+        )
+
+    def _setup_sources(self, config: dict):
+        """Create the sensor groups and sources of a zone configuration."""
+        self.zone_temp_sensor = config.get("zone_temp_sensor")
+        self.zone_humidity_sensor = config.get("zone_humidity_sensor")
+        self.trv_temp_sensors = config.get("trv_temp_sensors", [])
+        self.trv_humidity_sensors = config.get("trv_humidity_sensors", [])
+
+        self.temp_group = SensorGroup(
+            self.zone_temp_sensor,
+            self.trv_temp_sensors,
+            config.get(CONF_TEMP_AGGREGATION, DEFAULT_TEMP_AGGREGATION),
+            config.get(CONF_TRV_WEIGHTS),
+            config.get(CONF_TRIM_FRACTION, DEFAULT_TRIM_FRACTION),
+        )
+        self.humidity_group = SensorGroup(
+            self.zone_humidity_sensor, self.trv_humidity_sensors
+        )
+        self.groups = (self.temp_group, self.humidity_group)
+        groups_by_entity: dict[str, list[SensorGroup]] = {}
+        for group in self.groups:
+            for entity_id in (group.primary, *group.trvs):
+                if entity_id:
+                    groups_by_entity.setdefault(entity_id, []).append(group)
+        self._sources: dict[str, SensorSource] = {
+            entity_id: SensorSource(
+                entity_id,
+                tuple(groups),
+                TEMP_CELSIUS if self.temp_group in groups else None,
+            )
+            for entity_id, groups in groups_by_entity.items()
+        }
+
+    @property
+    def heating(self) -> bool:
+        """Return whether the zone is heating, as set by its climate entity."""
+        return self._heating
+
+    @heating.setter
+    def heating(self, heating: bool):
+        if heating != self._heating:
+            self._heating = heating
+            self._demand_changed(self)
+
+    @property
+    def source_entities(self) -> list[str]:
+        """Return every entity the zone reads from."""
+        return list(self._sources)
+
+    def restore(self, snapshot: dict):
+        """Load a zone snapshot saved before the last restart."""
+        self.climate_state = snapshot.get("climate", {})
+        self._saved_readings = snapshot.get("readings", {})
+        oldest = time.time() - (self.max_age or RESTORE_MAX_AGE)
+        self._restored = {
+            field: value
+            for field, (value, saved_at) in self._saved_readings.items()
+            if saved_at >= oldest
+        }
+
+    def snapshot(self) -> dict:
+        """Return the zone state to save for the next restart."""
+        data = self.data or ZoneData()
+        now = time.time()
+        for field, source in (
+            ("temperature", data.temp_source),
+            ("humidity", data.humidity_source),
+        ):
+            value = getattr(data, field)
+            if value is not None and source != SOURCE_RESTORED:
+                self._saved_readings[field] = [value, now]
+        return {"readings": self._saved_readings, "climate": self.climate_state}
+
+    @callback
+    def async_sample_history(self):
+        """Add the current readings to the history, pushing changed derived values."""
+        data = self.data or ZoneData()
+        self.history.sample(data.temperature, data.humidity, self.heating)
+        # Sampling alone must not cost every zone entity a state write
+        if self._rounded(self._history_values()) != self._rounded(
+            (
+                data.temp_rate,
+                data.temp_mean_1h,
+                data.temp_mean_24h,
+                data.humidity_mean_24h,
+                data.heating_duty,
+            )
+        ):
+            self._async_schedule_flush()
+
+    def _history_values(self) -> tuple[float | None, ...]:
+        """Return the rate, means and duty cycle derived from the history."""
+        history = self.history
+        duty = history.heating.mean(history.hour)
+        return (
+            history.temperature_rate,
+            history.temperature.mean(history.hour),
+            history.temperature.mean(history.day),
+            history.humidity.mean(history.day),
+            duty * 100 if duty is not None else None,
+        )
+
+    @staticmethod
+    def _rounded(values: tuple[float | None, ...]) -> tuple[float | None, ...]:
+        """Return values rounded as the zone sensors publish them."""
+        return tuple(
+            None if value is None else round(value, SUPPRESS_PRECISION)
+            for value in values
+        )
+
+    @callback
+    def async_stop(self):
+        """Cancel a pending push."""
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._window_handle:
+            self._window_handle.cancel()
+            self._window_handle = None
+
+    @callback
+    def async_reconfigure(self, config: dict):
+        """Apply new sources, aggregation and max age in place.
+
+        The history, restored readings and listeners are kept; only the
+        zone's aggregates are rebuilt from the state machine.
+        """
+        for entity_id in self._sources:
+            self._wheel.cancel((self, entity_id))
+        self.config = config
+        self.demand_priority = config.get(
+            CONF_DEMAND_PRIORITY, DEFAULT_DEMAND_PRIORITY
+        )
+        self.max_age = config.get(CONF_MAX_SENSOR_AGE, DEFAULT_MAX_SENSOR_AGE) * 60
+        self._setup_sources(config)
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._load_states()
+        self._async_flush_now()
+
+    async def _async_update_data(self) -> ZoneData:
+        """Rebuild the zone readings from the state machine."""
+        self._load_states()
+        return self._build_data()
+
+    def _load_states(self):
+        """Feed the current state of every source into freshly reset groups."""
+        for group in self.groups:
+            group.reset()
+        now = time.time()
+        for source in self._sources.values():
+            self._apply(source, self.hass.states.get(source.entity_id), now)
+
+    @callback
+    def async_handle_state_change(self, event: Event):
+        """Apply one source change as a delta and fan out to listeners."""
+        entity_id = event.data["entity_id"]
+        self.metrics.events[entity_id] += 1
+        source = self._sources.get(entity_id)
+        if source is None:
+            return
+        started = None
+        if self.metrics.sample("handle_event"):
+            started = time.perf_counter()
+        changed = self._apply(source, event.data.get("new_state"), time.time())
+        if not changed:
+            # Same numeric reading (or an attribute-only change)
+            self.recomputations_avoided += 1
+        else:
+            self._async_schedule_flush()
+        if started is not None:
+            self.metrics.record("handle_event", time.perf_counter() - started)
+
+    @callback
+    def async_expire(self, entity_id: str):
+        """Drop a reading that has not been reported within max_age."""
+        _LOGGER.debug("%s: reading of %s is stale", self.name, entity_id)
+        self.expired_readings += 1
+        source = self._sources[entity_id]
+        source.reported = None
+        changed = False
+        for group in source.groups:
+            changed |= group.update(entity_id, None)
+        if changed:
+            self._async_schedule_flush()
+
+    def _apply(self, source: SensorSource, state, now: float) -> bool:
+        """Feed a source state into its groups, return True if they changed."""
+        if state is not source.state:
+            # States are immutable apart from last_reported, so a state
+            # object already seen needs no parsing
+            source.state = state
+            value = self._read(state)
+            if value is not None:
+                unit = state.attributes.get(ATTR_UNIT_OF_MEASUREMENT)
+                if unit != source.unit:
+                    source.set_unit(unit)
+                if source.convert is not None:
+                    value = source.convert(value)
+            source.value = value
+        value = source.value
+        if value is None:
+            source.reported = None
+            if self.max_age:
+                self._wheel.cancel((self, source.entity_id))
+        else:
+            source.reported = reading_time(state)
+            if self.max_age:
+                deadline = source.reported + self.max_age
+                if deadline > now:
+                    self._wheel.schedule((self, source.entity_id), deadline)
+                else:
+                    # Already stale when it arrived
+                    source.reported = None
+                    value = None
+
+        changed = False
+        for group in source.groups:
+            changed |= group.update(source.entity_id, value)
+        return changed
+
+    @callback
+    def _async_schedule_flush(self):
+        """Push the new readings now or at the end of the coalescing window."""
+        if self._coalesce_window <= 0:
+            self._async_flush_now()
+            return
+
+        now = self.hass.loop.time()
+        self._last_change = now
+        if self._flush_handle is not None:
+            # Merged into the pending push
+            self.recomputations_avoided += 1
+            return
+        self._first_change = now
+        self._flush_handle = self.hass.loop.call_at(
+            now + self._coalesce_window, self._async_flush
+        )
+
+    @callback
+    def _async_flush(self):
+        """Push once the burst has settled or the latency cap is reached."""
+        self._flush_handle = None
+        deadline = min(
+            self._last_change + self._coalesce_window,
+            self._first_change + self._max_latency,
+        )
+        if self.hass.loop.time() < deadline:
+            self._flush_handle = self.hass.loop.call_at(deadline, self._async_flush)
+            return
+        self._async_flush_now()
+
+    @callback
+    def _async_flush_now(self):
+        """Build the zone readings and fan them out to listeners."""
+        if not self.metrics.sample("aggregate"):
+            self.async_set_updated_data(self._build_data())
+        else:
+            started = time.perf_counter()
+            data = self._build_data()
+            built = time.perf_counter()
+            self.async_set_updated_data(data)
+            self.metrics.record("aggregate", built - started)
+            self.metrics.record("push", time.perf_counter() - built)
+        # Readings change all the time and are only a stand-in after a
+        # restart, the pending save is also flushed on shutdown
+        self.schedule_save(STORAGE_READINGS_SAVE_DELAY)
+        # One computation now serves every listening entity
+        self.recomputations_avoided += max(len(self._listeners) - 1, 0)
+
+    def _check_window(self, temperature: float | None, variation) -> bool:
+        """Feed the open window detector, return True while a window is open."""
+        now = self.hass.loop.time()
+        detected = self._window.update(now, temperature, variation)
+        if detected and now >= self._window_open_until:
+            _LOGGER.info("%s: open window detected", self.name)
+            self.window_detections += 1
+            self.window_last_detected = dt_util.utcnow()
+            self._window_open_until = now + (
+                self.open_window_pause or OPEN_WINDOW_PERIOD
+            )
+            if self._window_handle:
+                self._window_handle.cancel()
+            self._window_handle = self.hass.loop.call_at(
+                self._window_open_until, self._async_window_closed
+            )
+        return now < self._window_open_until
+
+    @callback
+    def _async_window_closed(self):
+        """Push the end of an open window period."""
+        self._window_handle = None
+        self._async_flush_now()
+
+    @staticmethod
+    def _read(state) -> float | None:
+        """Return a state's numeric value, or None if it has none."""
+        if state is None or state.state in INVALID_STATES:
+            return None
+        try:
+            return float(state.state)
+        except ValueError:
+            return None
+
+    def _age(self, group: SensorGroup, source: str | None, now: float):
+        """Return the age in seconds of the oldest reading behind a value."""
+        if source == "Room":
+            reported = self._sources[group.primary].reported
+        elif source == "TRV":
+            reported = None
+            for entity_id in group.trvs:
+                trv_reported = self._sources[entity_id].reported
+                if trv_reported is not None and (
+                    reported is None or trv_reported < reported
+                ):
+                    reported = trv_reported
+        else:
+            return None
+        if reported is None:
+            return None
+        return round(max(now - reported, 0))
+
+    def _with_restored(self, field: str, value, source):
+        """Fall back to a restored reading until a live one arrives."""
+        if value is not None:
+            # Live readings replace the snapshot for good
+            self._restored.pop(field, None)
+            return value, source
+        restored = self._restored.get(field)
+        if restored is None:
+            return value, source
+        return restored, SOURCE_RESTORED
+
+    def _build_data(self) -> ZoneData:
+        """Derive all zone readings from the group aggregates."""
+        temp, temp_source, temp_variation = self.temp_group.result()
+        humidity, humidity_source, humidity_variation = self.humidity_group.result()
+        if self._restored:
+            temp, temp_source = self._with_restored("temperature", temp, temp_source)
+            humidity, humidity_source = self._with_restored(
+                "humidity", humidity, humidity_source
+            )
+        now = time.time()
+        rate, mean_1h, mean_24h, humidity_mean_24h, duty = self._history_values()
+        open_window = self._check_window(
+            temp if temp_source != SOURCE_RESTORED else None, temp_variation
+        )
+        return ZoneData(
+            temperature=temp,
+            humidity=humidity,
+            temp_source=temp_source,
+            humidity_source=humidity_source,
+            temp_variation=temp_variation,
+            humidity_variation=humidity_variation,
+            temp_age=self._age(self.temp_group, temp_source, now),
+            humidity_age=self._age(self.humidity_group, humidity_source, now),
+            temp_rate=rate,
+            temp_mean_1h=mean_1h,
+            temp_mean_24h=mean_24h,
+            humidity_mean_24h=humidity_mean_24h,
+            heating_duty=duty,
+            dew_point=dew_point(temp, humidity),
+            open_window=open_window,
+        )
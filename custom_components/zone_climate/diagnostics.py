@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from dataclasses import asdict
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry) -> dict:
+    """Return the configuration, readings and metrics of every zone."""
+    hub = hass.data[DOMAIN][entry.entry_id]
+    zones = {}
+    for zone_id, coordinator in hub.coordinators.items():
+        zones[zone_id] = {
+            "name": coordinator.name,
+            "config": dict(coordinator.config),
+            "data": asdict(coordinator.data) if coordinator.data else None,
+            "recomputations_avoided": coordinator.recomputations_avoided,
+            "expired_readings": coordinator.expired_readings,
+            "window_detections": coordinator.window_detections,
+            "metrics": coordinator.metrics.as_dict(),
+        }
+    return {
+        "entry": {"title": entry.title, "version": entry.version},
+        "hub": {
+            "source_entities": len(hub.source_entities),
+            "pending_expiries": len(hub.freshness),
+            "setup_time": hub.setup_time,
+            "dispatch": hub.dispatcher.as_dict(),
+            "boiler": (
+                {
+                    "entity_id": hub.boiler_entity,
+                    "firing": hub.boiler.heating,
+                    "demand": hub.boiler.total,
+                    "zones_calling": hub.boiler.zones,
+                    "cycles": hub.boiler.cycles,
+                }
+                if hub.boiler
+                else None
+            ),
+        },
+        "zones": zones,
+    }
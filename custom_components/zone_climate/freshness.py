@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import math
+from collections.abc import Hashable
+
+
+def reading_time(state) -> float:
+    """Return when a state was last reported, as a timestamp."""
+    # last_reported only exists on Home Assistant 2024.4 and later
+    reported = getattr(state, "last_reported", None) or state.last_updated
+    return reported.timestamp()
+
+
+class TimerWheel:
+    """Hashed timer wheel for expiring sensor readings.
+
+    Deadlines are hashed into a fixed ring of buckets, one per tick of
+    ``resolution`` seconds, and a single periodic ``advance`` call expires
+    whatever is due. Scheduling and cancelling are O(1) and no timer is
+    created per reading. Rescheduled or cancelled keys are left in their
+    old bucket and discarded when that bucket is next visited.
+    """
+
+    def __init__(self, resolution: float, slots: int):
+        """Initialize an empty wheel."""
+        self._resolution = resolution
+        self._buckets: list[set[Hashable]] = [set() for _ in range(slots)]
+        self._deadlines: dict[Hashable, float] = {}
+        self._last_tick: int | None = None
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def schedule(self, key: Hashable, deadline: float):
+        """Expire the key at the deadline, replacing any earlier deadline."""
+        self._deadlines[key] = deadline
+        self._buckets[self._slot(deadline)].add(key)
+
+    def cancel(self, key: Hashable):
+        """Stop the key from expiring."""
+        self._deadlines.pop(key, None)
+
+    def advance(self, now: float) -> list[Hashable]:
+        """Return the keys whose deadline has passed, removing them."""
+        now_tick = int(now // self._resolution)
+        if self._last_tick is None:
+            ticks = len(self._buckets)
+        else:
+            # After a long gap every bucket is visited once
+            ticks = min(now_tick - self._last_tick, len(self._buckets))
+        self._last_tick = now_tick
+
+        expired = []
+        for tick in range(now_tick - ticks + 1, now_tick + 1):
+            slot = tick % len(self._buckets)
+            bucket = self._buckets[slot]
+            for key in list(bucket):
+                deadline = self._deadlines.get(key)
+                if deadline is None or self._slot(deadline) != slot:
+                    # Cancelled, or rescheduled into another bucket
+                    bucket.discard(key)
+                elif deadline <= now:
+                    bucket.discard(key)
+                    del self._deadlines[key]
+                    expired.append(key)
+        return expired
+
+    def _slot(self, deadline: float) -> int:
+        # Rounded up, so the bucket is only visited once the deadline passed
+        return math.ceil(deadline / self._resolution) % len(self._buckets)
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import math
+from array import array
+
+NAN = float("nan")
+
+
+class RollingSeries:
+    """Fixed-size ring of samples with running means over trailing windows.
+
+    Samples live in a preallocated array of doubles, missing readings are
+    stored as NaN. A running sum and count is kept for each window, so
+    adding a sample and reading a mean are O(1) and memory never grows.
+    """
+
+    __slots__ = ("_values", "_size", "_next", "_filled", "_windows", "_sums", "_counts")
+
+    def __init__(self, size: int, windows: tuple[int, ...]):
+        """Initialize an empty series; windows are sample counts up to size."""
+        self._values = array("d", [NAN]) * size
+        self._size = size
+        self._next = 0
+        self._filled = 0
+        self._windows = windows
+        self._sums = [0.0] * len(windows)
+        self._counts = [0] * len(windows)
+
+    def add(self, value: float | None):
+        """Append a sample, dropping the oldest once the ring is full."""
+        if value is None:
+            value = NAN
+        for i, window in enumerate(self._windows):
+            if self._filled >= window:
+                old = self._values[(self._next - window) % self._size]
+                if not math.isnan(old):
+                    self._sums[i] -= old
+                    self._counts[i] -= 1
+                    if not self._counts[i]:
+                        self._sums[i] = 0.0
+            if not math.isnan(value):
+                self._sums[i] += value
+                self._counts[i] += 1
+        self._values[self._next] = value
+        self._next = (self._next + 1) % self._size
+        self._filled = min(self._filled + 1, self._size)
+
+    def mean(self, window: int) -> float | None:
+        """Return the mean of the valid samples in one of the windows."""
+        i = self._windows.index(window)
+        if not self._counts[i]:
+            return None
+        return self._sums[i] / self._counts[i]
+
+    def ago(self, samples: int) -> float | None:
+        """Return the sample taken the given number of samples before the last."""
+        if samples >= self._filled:
+            return None
+        value = self._values[(self._next - 1 - samples) % self._size]
+        return None if math.isnan(value) else value
+
+
+class ZoneHistory:
+    """Rolling 24 hour history of a zone sampled at a fixed interval."""
+
+    def __init__(self, interval: float, rate_window: float):
+        """Initialize empty series for one zone; times in seconds."""
+        self.hour = round(3600 / interval)
+        self.day = self.hour * 24
+        self._rate_samples = max(round(rate_window / interval), 1)
+        self._rate_hours = self._rate_samples * interval / 3600
+        self.temperature = RollingSeries(self.day, (self.hour, self.day))
+        self.humidity = RollingSeries(self.day, (self.day,))
+        self.heating = RollingSeries(self.day, (self.hour, self.day))
+
+    def sample(
+        self, temperature: float | None, humidity: float | None, heating: bool
+    ):
+        """Record one sample of the zone."""
+        self.temperature.add(temperature)
+        self.humidity.add(humidity)
+        self.heating.add(1.0 if heating else 0.0)
+
+    @property
+    def temperature_rate(self) -> float | None:
+        """Temperature change per hour over the rate window."""
+        latest = self.temperature.ago(0)
+        earlier = self.temperature.ago(self._rate_samples)
+        if latest is None or earlier is None:
+            return None
+        return (latest - earlier) / self._rate_hours
+
+
+def dew_point(temperature: float | None, humidity: float | None) -> float | None:
+    """Return the dew point in °C (Magnus formula)."""
+    if temperature is None or humidity is None or humidity <= 0:
+        return None
+    gamma = math.log(humidity / 100) + 17.62 * temperature / (243.12 + temperature)
+    return 243.12 * gamma / (17.62 - gamma)
@@ -0,0 +1,386 @@
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+
+from homeassistant.components.climate import HVACMode
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import (
+    async_track_state_change_event,
+    async_track_time_interval,
+)
+from homeassistant.helpers.start import async_at_started
+from homeassistant.helpers.storage import Store
+
+try:
+    from homeassistant.const import EVENT_STATE_REPORTED
+except ImportError:  # Home Assistant < 2024.4
+    EVENT_STATE_REPORTED = None
+
+from .actuator import ActuatorCommander, ActuatorDispatcher
+from .const import (
+    CONF_BOILER,
+    CONF_BOILER_MIN_DEMAND,
+    CONF_BOILER_MIN_OFF_TIME,
+    CONF_BOILER_MIN_ON_TIME,
+    CONF_DEMAND_PRIORITY,
+    CONF_MAX_SENSOR_AGE,
+    CONF_TEMP_AGGREGATION,
+    CONF_TRIM_FRACTION,
+    CONF_TRV_WEIGHTS,
+    CONF_ZONE_ID,
+    CONF_ZONES,
+    DEFAULT_BOILER_MIN_DEMAND,
+    DEFAULT_BOILER_MIN_OFF_TIME,
+    DEFAULT_BOILER_MIN_ON_TIME,
+    DISPATCH_MAX_CONCURRENT,
+    DISPATCH_TIMEOUT,
+    DOMAIN,
+    FRESHNESS_RESOLUTION,
+    FRESHNESS_SLOTS,
+    HISTORY_INTERVAL,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+)
+from .controller import BoilerDemand
+from .coordinator import ZoneClimateCoordinator
+from .freshness import TimerWheel
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def zone_configs(entry) -> list[tuple[str, dict]]:
+    """Return (zone_id, zone config) for every zone of a config entry."""
+    if CONF_ZONES in entry.data:
+        return [(zone[CONF_ZONE_ID], zone) for zone in entry.data[CONF_ZONES]]
+    # A plain zone entry is a hub of one, keyed by the entry itself
+    return [(entry.entry_id, entry.data)]
+
+
+# Zone options a running zone takes in place, as long as the zone keeps
+# the same entities; any other change reloads the entry
+RECONFIGURABLE = frozenset(
+    {
+        "zone_temp_sensor",
+        "zone_humidity_sensor",
+        "trv_temp_sensors",
+        "trv_humidity_sensors",
+        "primary_heating_control",
+        "backup_heating_control",
+        CONF_TEMP_AGGREGATION,
+        CONF_TRV_WEIGHTS,
+        CONF_TRIM_FRACTION,
+        CONF_MAX_SENSOR_AGE,
+        CONF_DEMAND_PRIORITY,
+    }
+)
+
+
+def hub_options(entry) -> dict:
+    """Return the entry-wide options, which a plain zone entry has none of."""
+    if CONF_ZONES not in entry.data:
+        return {}
+    return {key: value for key, value in entry.data.items() if key != CONF_ZONES}
+
+
+def _entities(config: dict) -> tuple[bool, ...]:
+    """Return which of the optional zone entities a zone config creates."""
+    temp = (config.get("zone_temp_sensor"), config.get("trv_temp_sensors"))
+    humidity = (config.get("zone_humidity_sensor"), config.get("trv_humidity_sensors"))
+    return (
+        any(temp),
+        all(temp),
+        any(humidity),
+        all(humidity),
+        bool(config.get("backup_heating_control")),
+    )
+
+
+class ZoneClimateHub:
+    """All zones of one config entry, fed by a single state listener.
+
+    A reverse index maps each source entity to the zones that read it, so
+    every state change is dispatched only to the zones it affects. Stale
+    readings of all zones are expired from one shared timer wheel, and
+    the state of all zones is saved to one snapshot for warm restarts.
+    Actuator commands of all zones go through one batching dispatcher,
+    and an optional boiler is driven from the demand of all zones. Changed
+    zone options are applied to the running zones where possible.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry):
+        """Initialize the hub and a coordinator per zone."""
+        self.hass = hass
+        self.entry = entry
+        self.freshness = TimerWheel(FRESHNESS_RESOLUTION, FRESHNESS_SLOTS)
+        self.dispatcher = ActuatorDispatcher(
+            hass, DISPATCH_MAX_CONCURRENT, DISPATCH_TIMEOUT
+        )
+        self.coordinators: dict[str, ZoneClimateCoordinator] = {
+            zone_id: ZoneClimateCoordinator(
+                hass,
+                zone_id,
+                config,
+                self.freshness,
+                self.async_schedule_save,
+                self._async_demand_changed,
+            )
+            for zone_id, config in zone_configs(entry)
+        }
+
+        # Whole-house boiler, fired from the heat demand of every zone
+        self.boiler_entity: str | None = entry.data.get(CONF_BOILER)
+        self.boiler: BoilerDemand | None = None
+        self._boiler_on: bool | None = None
+        self._boiler_handle = None
+        if self.boiler_entity:
+            self.boiler = BoilerDemand(
+                entry.data.get(CONF_BOILER_MIN_DEMAND, DEFAULT_BOILER_MIN_DEMAND),
+                entry.data.get(CONF_BOILER_MIN_ON_TIME, DEFAULT_BOILER_MIN_ON_TIME),
+                entry.data.get(CONF_BOILER_MIN_OFF_TIME, DEFAULT_BOILER_MIN_OFF_TIME),
+            )
+            self._boiler_commander = ActuatorCommander(hass, 0, self.dispatcher)
+        self._options = hub_options(entry)
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}")
+        self._save_due: float | None = None
+        self.setup_time: dict[str, float] = {}
+        self._index: dict[str, list[ZoneClimateCoordinator]] = {}
+        self._unsub_sources = None
+        self._unsub_freshness = []
+        self._unsub_history = []
+
+    @property
+    def source_entities(self) -> list[str]:
+        """Return every entity read by at least one zone."""
+        return list(self._index)
+
+    async def async_setup(self):
+        """Load the initial readings and subscribe to every source once."""
+        snapshot = await self._store.async_load() or {}
+        for zone_id, coordinator in self.coordinators.items():
+            coordinator.restore(snapshot.get(zone_id, {}))
+            await coordinator.async_refresh()
+            for entity_id in coordinator.source_entities:
+                self._index.setdefault(entity_id, []).append(coordinator)
+
+        self._async_subscribe_sources()
+
+        # History sampling is not needed to boot, it starts once started
+        self._unsub_history.append(
+            async_at_started(self.hass, self._async_start_history)
+        )
+        if self.boiler:
+            # Like the zones, the boiler is only driven once started
+            self._unsub_history.append(
+                async_at_started(self.hass, self._async_update_boiler)
+            )
+
+        self._async_track_freshness()
+
+    @callback
+    def _async_subscribe_sources(self):
+        """Subscribe to exactly the source entities in the index."""
+        if self._unsub_sources:
+            self._unsub_sources()
+            self._unsub_sources = None
+        if self._index:
+            self._unsub_sources = async_track_state_change_event(
+                self.hass, list(self._index), self._async_source_changed
+            )
+
+    @callback
+    def _async_track_freshness(self):
+        """Expire stale readings once any zone has a max sensor age."""
+        if self._unsub_freshness or not any(
+            coordinator.max_age for coordinator in self.coordinators.values()
+        ):
+            return
+        self._unsub_freshness.append(
+            async_track_time_interval(
+                self.hass,
+                self._async_expire_readings,
+                timedelta(seconds=FRESHNESS_RESOLUTION),
+            )
+        )
+        if EVENT_STATE_REPORTED:
+            # Unchanged reports only update last_reported, but still
+            # prove the sensor is alive
+            self._unsub_freshness.append(
+                self.hass.bus.async_listen(
+                    EVENT_STATE_REPORTED,
+                    self._async_source_changed,
+                    event_filter=self._async_is_source,
+                )
+            )
+
+    @callback
+    def async_reconfigure(self) -> bool:
+        """Apply changed zone options to the running zones.
+
+        Returns False, changing nothing, if the change needs a reload.
+        """
+        zones = dict(zone_configs(self.entry))
+        if zones.keys() != self.coordinators.keys() or (
+            hub_options(self.entry) != self._options
+        ):
+            return False
+        changes = []
+        for zone_id, config in zones.items():
+            coordinator = self.coordinators[zone_id]
+            old = coordinator.config
+            if config == old:
+                continue
+            changed = {
+                key
+                for key in old.keys() | config.keys()
+                if old.get(key) != config.get(key)
+            }
+            if changed - RECONFIGURABLE or _entities(config) != _entities(old):
+                return False
+            changes.append((coordinator, config))
+
+        sources_changed = False
+        for coordinator, config in changes:
+            _LOGGER.debug("%s: applying new options in place", coordinator.name)
+            old_sources = set(coordinator.source_entities)
+            coordinator.async_reconfigure(config)
+            new_sources = set(coordinator.source_entities)
+            for entity_id in old_sources - new_sources:
+                self._index[entity_id].remove(coordinator)
+                if not self._index[entity_id]:
+                    del self._index[entity_id]
+            for entity_id in new_sources - old_sources:
+                self._index.setdefault(entity_id, []).append(coordinator)
+            sources_changed |= old_sources != new_sources
+            # A new priority counts towards the boiler right away
+            self._async_demand_changed(coordinator)
+        if sources_changed:
+            # The tracker takes a fixed list, so the index is subscribed
+            # afresh and removed entities are dropped
+            self._async_subscribe_sources()
+        self._async_track_freshness()
+        return True
+
+    @callback
+    def async_stop(self):
+        """Drop the source subscription and pending zone pushes."""
+        if self._unsub_sources:
+            self._unsub_sources()
+            self._unsub_sources = None
+        while self._unsub_freshness:
+            self._unsub_freshness.pop()()
+        while self._unsub_history:
+            self._unsub_history.pop()()
+        for coordinator in self.coordinators.values():
+            coordinator.async_stop()
+        if self._boiler_handle:
+            self._boiler_handle.cancel()
+            self._boiler_handle = None
+        if self.boiler:
+            self._boiler_commander.async_cancel()
+
+    @callback
+    def _async_start_history(self, _hass=None):
+        """Sample every zone's history at a fixed interval."""
+        self._unsub_history.append(
+            async_track_time_interval(
+                self.hass,
+                self._async_sample_history,
+                timedelta(seconds=HISTORY_INTERVAL),
+            )
+        )
+
+    @callback
+    def _async_sample_history(self, now=None):
+        for coordinator in self.coordinators.values():
+            coordinator.async_sample_history()
+
+    @callback
+    def async_schedule_save(self, delay: float = STORAGE_SAVE_DELAY):
+        """Save the zone snapshot within the given debounce delay."""
+        # The snapshot is built when the write happens, so a request only
+        # needs to reach the Store when it brings the write forward
+        due = self.hass.loop.time() + delay
+        if self._save_due is not None and self._save_due <= due:
+            return
+        self._save_due = due
+        self._store.async_delay_save(self._snapshot, delay)
+
+    @callback
+    def _snapshot(self) -> dict:
+        """Return the snapshot of every zone."""
+        self._save_due = None
+        return {
+            zone_id: coordinator.snapshot()
+            for zone_id, coordinator in self.coordinators.items()
+        }
+
+    @callback
+    def _async_source_changed(self, event: Event):
+        """Dispatch a state change to the zones that read the entity."""
+        for coordinator in self._index.get(event.data["entity_id"], ()):
+            coordinator.async_handle_state_change(event)
+
+    @callback
+    def _async_is_source(self, event_data) -> bool:
+        """Return True if a reported state belongs to one of the zones."""
+        return event_data["entity_id"] in self._index
+
+    @callback
+    def _async_expire_readings(self, now):
+        """Expire the readings that are due on the shared timer wheel."""
+        for coordinator, entity_id in self.freshness.advance(now.timestamp()):
+            coordinator.async_expire(entity_id)
+
+    @callback
+    def _async_demand_changed(self, coordinator: ZoneClimateCoordinator):
+        """Update the boiler demand when a zone starts or stops heating."""
+        if self.boiler is None:
+            return
+        priority = coordinator.demand_priority if coordinator.heating else None
+        if self.boiler.set_zone(coordinator.zone_id, priority):
+            self._async_update_boiler()
+
+    @callback
+    def _async_update_boiler(self, _hass=None):
+        """Fire or stop the boiler from the total demand of the zones."""
+        if self._boiler_handle:
+            self._boiler_handle.cancel()
+            self._boiler_handle = None
+        firing = self.boiler.decide(self.hass.loop.time())
+        if (switch_at := self.boiler.switch_at()) is not None:
+            # Held against the demand, look again once it may switch
+            self._boiler_handle = self.hass.loop.call_at(
+                switch_at, self._async_update_boiler
+            )
+        if firing == self._boiler_on:
+            return
+        self._boiler_on = firing
+        _LOGGER.debug(
+            "%s: boiler %s, demand %.1f from %d zones",
+            self.entry.title,
+            "firing" if firing else "off",
+            self.boiler.total,
+            self.boiler.zones,
+        )
+        self.hass.async_create_task(self._async_command_boiler(firing))
+
+    async def _async_command_boiler(self, on: bool):
+        """Switch the boiler on or off."""
+        domain = self.boiler_entity.split(".")[0]
+        if domain == "climate":
+            service = "set_hvac_mode"
+            data = {
+                "entity_id": self.boiler_entity,
+                "hvac_mode": HVACMode.HEAT if on else HVACMode.OFF,
+            }
+        else:
+            service = "turn_on" if on else "turn_off"
+            data = {"entity_id": self.boiler_entity}
+        try:
+            await self._boiler_commander.async_send(domain, service, data)
+        except HomeAssistantError as err:
+            _LOGGER.warning("%s: boiler %s failed: %s", self.entry.title, service, err)
+            # Send the decision again on the next change
+            self._boiler_on = None
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import logging
+from collections import Counter
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class TimingStats:
+    """Running count, mean and max of one timed code path."""
+
+    __slots__ = ("count", "total", "max", "last")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def add(self, duration: float):
+        """Add one measurement, in seconds."""
+        self.count += 1
+        self.total += duration
+        self.last = duration
+        if duration > self.max:
+            self.max = duration
+
+    def as_dict(self) -> dict:
+        """Return the stats in milliseconds."""
+        mean = self.total / self.count if self.count else 0.0
+        return {
+            "count": self.count,
+            "mean_ms": round(mean * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+            "last_ms": round(self.last * 1000, 3),
+        }
+
+
+class ZoneMetrics:
+    """Instrumentation for one zone, cheap enough to leave on.
+
+    Counters are always kept. Timings of the per-event hot paths are only
+    taken for one in ``sample_rate`` calls; rarer paths such as actuator
+    service calls are always timed. Any timed callback slower than
+    ``slow_threshold`` seconds is logged as a warning; paths that await
+    devices record their latency without it.
+    """
+
+    def __init__(self, name: str, sample_rate: int, slow_threshold: float):
+        """Initialize empty metrics."""
+        self.name = name
+        self.sample_rate = max(int(sample_rate), 1)
+        self.slow_threshold = slow_threshold
+        self.events: Counter[str] = Counter()
+        self.state_writes = 0
+        self.slow_calls = 0
+        self.timings: dict[str, TimingStats] = {}
+        self._calls: Counter[str] = Counter()
+
+    def sample(self, path: str) -> bool:
+        """Return True if this call of a hot path should be timed."""
+        self._calls[path] += 1
+        return self._calls[path] % self.sample_rate == 0
+
+    def record(self, path: str, duration: float, check_slow: bool = True):
+        """Record one timing of a code path, in seconds."""
+        stats = self.timings.get(path)
+        if stats is None:
+            stats = self.timings[path] = TimingStats()
+        stats.add(duration)
+        if check_slow and duration > self.slow_threshold:
+            self.slow_calls += 1
+            _LOGGER.warning(
+                "%s: %s took %.1f ms (threshold %.1f ms)",
+                self.name,
+                path,
+                duration * 1000,
+                self.slow_threshold * 1000,
+            )
+
+    @property
+    def total_events(self) -> int:
+        """Number of source state changes handled."""
+        return self.events.total()
+
+    def as_dict(self) -> dict:
+        """Return all metrics for diagnostics."""
+        return {
+            "sample_rate": self.sample_rate,
+            "slow_threshold_ms": round(self.slow_threshold * 1000, 1),
+            "events_total": self.total_events,
+            "events_by_source": dict(self.events.most_common()),
+            "state_writes": self.state_writes,
+            "slow_calls": self.slow_calls,
+            "timings": {
+                path: stats.as_dict() for path, stats in self.timings.items()
+            },
+        }
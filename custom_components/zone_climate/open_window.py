@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from collections import deque
+
+from .regression import RunningRegression
+
+
+class OpenWindowDetector:
+    """Spot an open window from a fast fall of the zone temperature.
+
+    Readings within a trailing period feed a least-squares slope kept as
+    running sums. Each reading is added once and evicted once, so an update
+    is amortized O(1). A window is reported when the slope would lose at
+    least ``drop`` degrees over the period and, if the zone has TRVs, the
+    room reads at least ``variation`` degrees below them.
+    """
+
+    def __init__(self, period: float, drop: float, variation: float, min_span: float):
+        """Initialize an empty detector; times are in seconds."""
+        self._period = period
+        self._drop = drop
+        self._variation = variation
+        self._min_span = min_span
+        self._samples: deque[tuple[float, float]] = deque()
+        self._fit = RunningRegression()
+
+    def update(
+        self, now: float, temperature: float | None, variation: float | None
+    ) -> bool:
+        """Add a reading and return True if it looks like an open window."""
+        samples = self._samples
+        while samples and samples[0][0] <= now - self._period:
+            self._fit.remove(*samples.popleft())
+        if temperature is None:
+            return False
+        if not samples:
+            self._fit.reset(now)
+        samples.append((now, temperature))
+        self._fit.add(now, temperature)
+
+        slope = self._slope()
+        if slope is None or slope * self._period > -self._drop:
+            return False
+        return variation is None or variation <= -self._variation
+
+    def _slope(self) -> float | None:
+        """Return the slope in degrees per second, once enough is known."""
+        samples = self._samples
+        if len(samples) < 3 or samples[-1][0] - samples[0][0] < self._min_span:
+            return None
+        return self._fit.slope()
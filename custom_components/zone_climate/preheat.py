@@ -0,0 +1,106 @@
+"""Optimum start: learn how fast a zone heats and preheat for schedules.
+
+Plain Python like the controllers, so it can be exercised without Home
+Assistant: times are passed in by the caller.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import datetime, time, timedelta
+
+from .regression import RunningRegression
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class HeatRateEstimator:
+    """Rolling least-squares heat-up rate in degrees per minute.
+
+    Samples taken while the zone is heating are kept in a fixed-size ring
+    buffer together with running sums, so adding a sample and reading the
+    slope are O(1). Each heating run starts a new regression; the last
+    rate learned from a long enough run is kept between runs.
+    """
+
+    def __init__(self, size: int, min_samples: int, min_span: float):
+        """Initialize an empty estimator."""
+        self._times = [0.0] * size
+        self._temps = [0.0] * size
+        self._size = size
+        self._next = 0
+        self._min_samples = min_samples
+        self._min_span = min_span
+        self._fit = RunningRegression()
+        self.rate: float | None = None
+
+    def end_run(self):
+        """Finish the current heating run."""
+        self._fit.reset()
+        self._next = 0
+
+    def add(self, minutes: float, temperature: float | None):
+        """Add a sample of the current heating run; no reading ends the run."""
+        if temperature is None:
+            self.end_run()
+            return
+        if self._fit.count == 0:
+            self._fit.reset(minutes)
+        elif self._fit.count == self._size:
+            self._fit.remove(self._times[self._next], self._temps[self._next])
+        self._fit.add(minutes, temperature)
+        self._times[self._next] = minutes
+        self._temps[self._next] = temperature
+        self._next = (self._next + 1) % self._size
+
+        slope = self._slope()
+        if slope is not None and slope > 0:
+            self.rate = slope
+
+    def _slope(self) -> float | None:
+        """Return the regression slope once the run is long enough."""
+        n = self._fit.count
+        if n < self._min_samples:
+            return None
+        # Once the ring is full the oldest sample is the next to be replaced
+        oldest = self._times[self._next if n == self._size else 0]
+        newest = self._times[(self._next - 1) % self._size]
+        if newest - oldest < self._min_span:
+            return None
+        return self._fit.slope()
+
+
+class PreheatScheduler:
+    """Daily setpoint schedule, started early enough to be met on time."""
+
+    def __init__(self, schedule: list[dict], max_preheat: float):
+        """Initialize from [{"time": "HH:MM", "temperature": t}, ...]."""
+        self.max_preheat = max_preheat
+        self.entries: list[tuple[time, float]] = []
+        for entry in schedule:
+            try:
+                at = time.fromisoformat(str(entry["time"]))
+                temperature = float(entry["temperature"])
+            except (KeyError, TypeError, ValueError):
+                _LOGGER.warning("Ignoring invalid schedule entry %s", entry)
+                continue
+            self.entries.append((at, temperature))
+        self.entries.sort()
+
+    def next_setpoint(self, after: datetime) -> tuple[datetime, float] | None:
+        """Return the first scheduled (time, temperature) after a moment."""
+        for day in (0, 1):
+            date = (after + timedelta(days=day)).date()
+            for at, temperature in self.entries:
+                when = datetime.combine(date, at, after.tzinfo)
+                if when > after:
+                    return when, temperature
+        return None
+
+    def lead_time(
+        self, current: float | None, target: float, rate: float | None
+    ) -> timedelta:
+        """Return how long before a setpoint heating has to start."""
+        if current is None or rate is None or target <= current:
+            return timedelta()
+        minutes = min((target - current) / rate, self.max_preheat)
+        return timedelta(minutes=minutes)
@@ -0,0 +1,47 @@
+"""Least-squares slope over a sliding set of samples."""
+from __future__ import annotations
+
+
+class RunningRegression:
+    """Least-squares slope kept as running sums.
+
+    Callers own the samples: each one is added once and removed once with
+    the same values, so keeping the slope up to date is O(1).
+    """
+
+    def __init__(self):
+        """Initialize an empty regression."""
+        self.reset()
+
+    def reset(self, origin: float = 0.0):
+        """Drop all samples; later x values are taken relative to origin."""
+        # Relative x values keep the sums small and precise
+        self._origin = origin
+        self.count = 0
+        self._sum_x = self._sum_y = self._sum_xx = self._sum_xy = 0.0
+
+    def add(self, x: float, y: float):
+        """Add a sample."""
+        x -= self._origin
+        self.count += 1
+        self._sum_x += x
+        self._sum_y += y
+        self._sum_xx += x * x
+        self._sum_xy += x * y
+
+    def remove(self, x: float, y: float):
+        """Remove a sample added earlier."""
+        x -= self._origin
+        self.count -= 1
+        self._sum_x -= x
+        self._sum_y -= y
+        self._sum_xx -= x * x
+        self._sum_xy -= x * y
+
+    def slope(self) -> float | None:
+        """Return the slope of y over x, or None while it is undefined."""
+        n = self.count
+        denominator = n * self._sum_xx - self._sum_x * self._sum_x
+        if n < 2 or denominator <= 0:
+            return None
+        return (n * self._sum_xy - self._sum_x * self._sum_y) / denominator
@@ -1,248 +1,269 @@
 import logging
-from homeassistant.components.sensor import SensorEntity
-from homeassistant.helpers.entity import DeviceInfo
-from homeassistant.helpers.entity import Entity
+from datetime import timedelta
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
+from homeassistant.const import EntityCategory
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from .const import DOMAIN
 from .const import TEMP_CELSIUS
+from .const import (
+    CONF_SUPPRESS_UNCHANGED,
+    DEFAULT_SUPPRESS_UNCHANGED,
+    SUPPRESS_PRECISION,
+)
+from .coordinator import ZoneClimateCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
+# Only the diagnostic metric sensors poll
+SCAN_INTERVAL = timedelta(seconds=60)
+
 async def async_setup_entry(hass, entry, async_add_entities):
     """Set up Zone Climate sensors from config entry."""
-    zone_name = entry.data.get("zone_name")
-    zone_temp_sensor = entry.data.get("zone_temp_sensor")
-    trv_temp_sensors = entry.data.get("trv_temp_sensors", [])
-    zone_humidity_sensor = entry.data.get("zone_humidity_sensor")
-    trv_humidity_sensors = entry.data.get("trv_humidity_sensors", [])
-
-    entities = [
-        ZoneTemperatureSensor(
-            entry=entry,
-            name=f"{zone_name} Temperature",
-            zone_temp_sensor=zone_temp_sensor,
-            trv_temp_sensors=trv_temp_sensors,
-        ),
-        ZoneHumiditySensor(
-            entry=entry,
-            name=f"{zone_name} Humidity",
-            zone_humidity_sensor=zone_humidity_sensor,
-            trv_humidity_sensors=trv_humidity_sensors,
-        ),
-        ZoneTempSource(entry, f"{zone_name} Temperature Source", "zone_temp_source"),
-        ZoneHumiditySource(entry, f"{zone_name} Humidity Source", "zone_humidity_source"),
-        ZoneSensor(entry, f"{zone_name} Temperature Variation", "zone_temp_variation"),
-        ZoneSensor(entry, f"{zone_name} Humidity Variation", "zone_humidity_variation"),
-    ]
-    async_add_entities(entities, True)
-
-
-class ZoneSensor(Entity):
-    def __init__(self, entry, name, kind):
-        self._entry = entry
+    hub = hass.data[DOMAIN][entry.entry_id]
+
+    entities = []
+    for coordinator in hub.coordinators.values():
+        zone_name = coordinator.config.get("zone_name")
+        # Only create the sensors the zone's configured sources can feed;
+        # variations need both a room sensor and TRVs
+        temp, humidity = coordinator.temp_group, coordinator.humidity_group
+        if temp.primary or temp.trvs:
+            entities += [
+                ZoneTemperatureSensor(coordinator, f"{zone_name} Temperature"),
+                ZoneTempSource(
+                    coordinator, f"{zone_name} Temperature Source", "zone_temp_source"
+                ),
+            ]
+        if temp.primary and temp.trvs:
+            entities.append(
+                ZoneSensor(
+                    coordinator,
+                    f"{zone_name} Temperature Variation",
+                    "zone_temp_variation",
+                )
+            )
+        if temp.primary or temp.trvs:
+            entities += [
+                ZoneDerivedSensor(
+                    coordinator,
+                    f"{zone_name} Temperature Rate",
+                    "temp_rate",
+                    f"{TEMP_CELSIUS}/h",
+                ),
+                ZoneDerivedSensor(
+                    coordinator,
+                    f"{zone_name} Temperature Mean 1h",
+                    "temp_mean_1h",
+                    TEMP_CELSIUS,
+                    SensorDeviceClass.TEMPERATURE,
+                ),
+                ZoneDerivedSensor(
+                    coordinator,
+                    f"{zone_name} Temperature Mean 24h",
+                    "temp_mean_24h",
+                    TEMP_CELSIUS,
+                    SensorDeviceClass.TEMPERATURE,
+                ),
+            ]
+        if humidity.primary or humidity.trvs:
+            entities += [
+                ZoneHumiditySensor(coordinator, f"{zone_name} Humidity"),
+                ZoneHumiditySource(
+                    coordinator,
+                    f"{zone_name} Humidity Source",
+                    "zone_humidity_source",
+                ),
+            ]
+        if humidity.primary and humidity.trvs:
+            entities.append(
+                ZoneSensor(
+                    coordinator,
+                    f"{zone_name} Humidity Variation",
+                    "zone_humidity_variation",
+                )
+            )
+        if humidity.primary or humidity.trvs:
+            entities.append(
+                ZoneDerivedSensor(
+                    coordinator,
+                    f"{zone_name} Humidity Mean 24h",
+                    "humidity_mean_24h",
+                    "%",
+                    SensorDeviceClass.HUMIDITY,
+                )
+            )
+            if temp.primary or temp.trvs:
+                entities.append(
+                    ZoneDerivedSensor(
+                        coordinator,
+                        f"{zone_name} Dew Point",
+                        "dew_point",
+                        TEMP_CELSIUS,
+                        SensorDeviceClass.TEMPERATURE,
+                    )
+                )
+        entities += [
+            ZoneDerivedSensor(
+                coordinator, f"{zone_name} Heating Duty Cycle", "heating_duty", "%"
+            ),
+            ZoneMetricSensor(
+                coordinator, f"{zone_name} Events Handled", "events_handled"
+            ),
+            ZoneMetricSensor(coordinator, f"{zone_name} State Writes", "state_writes"),
+            ZoneMetricSensor(coordinator, f"{zone_name} Update Time", "update_time"),
+        ]
+    async_add_entities(entities)
+
+
+class ZoneSensor(CoordinatorEntity[ZoneClimateCoordinator], SensorEntity):
+    """A zone reading pushed by the shared coordinator."""
+
+    _attr_should_poll = False
+
+    # Coordinator data fields (value, source label) backing each sensor kind
+    _FIELDS = {
+        "temperature": ("temperature", "temp_source"),
+        "humidity": ("humidity", "humidity_source"),
+        "zone_temp_source": ("temp_source", "temp_source"),
+        "zone_humidity_source": ("humidity_source", "humidity_source"),
+        "zone_temp_variation": ("temp_variation", "temp_source"),
+        "zone_humidity_variation": ("humidity_variation", "humidity_source"),
+        "temp_rate": ("temp_rate", "temp_source"),
+        "temp_mean_1h": ("temp_mean_1h", "temp_source"),
+        "temp_mean_24h": ("temp_mean_24h", "temp_source"),
+        "humidity_mean_24h": ("humidity_mean_24h", "humidity_source"),
+        "heating_duty": ("heating_duty", "heating_duty"),
+        "dew_point": ("dew_point", "humidity_source"),
+    }
+
+    def __init__(self, coordinator, name, kind):
+        super().__init__(coordinator)
         self._attr_name = name
-        self._attr_unique_id = f"{entry.entry_id}_{kind}"
-        self._kind = kind
-        self._state = None
-
-    @property
-    def unique_id(self):
-        return self._attr_unique_id
+        self._attr_unique_id = f"{coordinator.zone_id}_{kind}"
+        self._field, self._source_field = self._FIELDS[kind]
+        self._suppress_unchanged = coordinator.config.get(
+            CONF_SUPPRESS_UNCHANGED, DEFAULT_SUPPRESS_UNCHANGED
+        )
+        self._last_written = None
+
+    async def async_added_to_hass(self) -> None:
+        """Remember the state written when the entity is added."""
+        await super().async_added_to_hass()
+        self._last_written = self._snapshot()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when the rounded value or its source changed."""
+        snapshot = self._snapshot()
+        if self._suppress_unchanged and snapshot == self._last_written:
+            return
+        self._last_written = snapshot
+        self.async_write_ha_state()
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state, counting writes for diagnostics."""
+        self.coordinator.metrics.state_writes += 1
+        super().async_write_ha_state()
+
+    def _snapshot(self):
+        """Return the rounded value and source label currently published."""
+        data = self.coordinator.data
+        if data is None:
+            return None
+        value = getattr(data, self._field)
+        if isinstance(value, float):
+            value = round(value, SUPPRESS_PRECISION)
+        return value, getattr(data, self._source_field)
 
     @property
-    def state(self):
-        return self._state
-
-    @property
-    def device_info(self):
-        return {
-            "identifiers": {(DOMAIN, self._entry.entry_id)},
-            "name": self._entry.data.get("zone_name"),
-            "manufacturer": "Zenntrix Software",
-            "model": "Zone Climate",
-        }
-    
-class ZoneTemperatureSensor(SensorEntity):
-    """Representation of a Zone Temperature Sensor."""
+    def native_value(self):
+        """Return the current value from the coordinator."""
+        if self.coordinator.data is None:
+            return None
+        return getattr(self.coordinator.data, self._field)
 
-    def __init__(self, entry, name, zone_temp_sensor, trv_temp_sensors):
-        self._entry = entry
-        self._attr_name = name
-        self._zone_temp_sensor = zone_temp_sensor
-        self._trv_temp_sensors = trv_temp_sensors
-        self._state = None
-        
     @property
     def device_info(self):
         return {
-            "identifiers": {(DOMAIN, self._entry.entry_id)},
-            "name": self._entry.data.get("zone_name"),
+            "identifiers": {(DOMAIN, self.coordinator.zone_id)},
+            "name": self.coordinator.config.get("zone_name"),
             "manufacturer": "Zenntrix Software",
             "model": "Zone Climate",
         }
-    
-    @property
-    def unique_id(self):
-        return f"{self._entry.entry_id}_temperature"
 
-    @property
-    def name(self):
-        return self._attr_name
+class ZoneTemperatureSensor(ZoneSensor):
+    """Representation of a Zone Temperature Sensor."""
 
-    @property
-    def state(self):
-        return self._state if self._state is not None else "unavailable"
+    _attr_device_class = SensorDeviceClass.TEMPERATURE
+    _attr_native_unit_of_measurement = TEMP_CELSIUS
 
-    @property
-    def unit_of_measurement(self):
-        return TEMP_CELSIUS
-
-    async def async_update(self):
-        """Fetch new state data for the sensor."""
-        if self._zone_temp_sensor:
-            self._state = self.hass.states.get(self._zone_temp_sensor).state
-        elif self._trv_temp_sensors:
-            values = [
-                float(self.hass.states.get(sensor).state)
-                for sensor in self._trv_temp_sensors
-                if self.hass.states.get(sensor) is not None
-            ]
-            self._state = sum(values) / len(values) if values else None
+    def __init__(self, coordinator, name):
+        super().__init__(coordinator, name, "temperature")
 
-class ZoneHumiditySensor(SensorEntity):
+class ZoneHumiditySensor(ZoneSensor):
     """Representation of a Zone Humidity Sensor."""
 
-    def __init__(self, entry, name, zone_humidity_sensor, trv_humidity_sensors):
-        self._entry = entry
-        self._attr_name = name
-        self._zone_humidity_sensor = zone_humidity_sensor
-        self._trv_humidity_sensors = trv_humidity_sensors
-        self._state = None
+    _attr_native_unit_of_measurement = "%"
 
-    @property
-    def device_info(self):
-        return {
-            "identifiers": {(DOMAIN, self._entry.entry_id)},
-            "name": self._entry.data.get("zone_name"),
-            "manufacturer": "Zenntrix Software",
-            "model": "Zone Climate",
-        }
-    
-    @property
-    def unique_id(self):
-        return f"{self._entry.entry_id}_humidity"
+    def __init__(self, coordinator, name):
+        super().__init__(coordinator, name, "humidity")
 
-    @property
-    def name(self):
-        return self._attr_name
+class ZoneDerivedSensor(ZoneSensor):
+    """A value derived from the zone's rolling in-memory history."""
 
-    @property
-    def state(self):
-        return self._state if self._state is not None else "unavailable"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 1
 
-    @property
-    def unit_of_measurement(self):
-        return "%"
-
-    async def async_update(self):
-        """Fetch new state data for the sensor."""
-        if self._zone_humidity_sensor:
-            self._state = self.hass.states.get(self._zone_humidity_sensor).state
-        elif self._trv_humidity_sensors:
-            values = [
-                float(self.hass.states.get(sensor).state)
-                for sensor in self._trv_humidity_sensors
-                if self.hass.states.get(sensor) is not None
-            ]
-            self._state = sum(values) / len(values) if values else None
+    def __init__(self, coordinator, name, kind, unit, device_class=None):
+        super().__init__(coordinator, name, kind)
+        self._attr_native_unit_of_measurement = unit
+        self._attr_device_class = device_class
 
-class ZoneTempSource(SensorEntity):
+class ZoneTempSource(ZoneSensor):
     """Representation of the temperature source sensor."""
 
-    def __init__(self, entry, name, unique_id):
-        """Initialize the temperature source sensor."""
-        self._entry = entry
-        self._attr_name = name
-        self._attr_unique_id = unique_id
-        self._primary_sensor = entry.data.get("zone_temp_sensor")
-        self._backup_sensors = entry.data.get("trv_temp_sensors", [])
-        self._state = None
+class ZoneHumiditySource(ZoneSensor):
+    """Representation of the humidity source sensor."""
 
-    @property
-    def device_info(self):
-        """Return device information for the sensor."""
-        return {
-            "identifiers": {(DOMAIN, self._entry.entry_id)},
-            "name": self._entry.data.get("zone_name"),
-            "manufacturer": "Zenntrix Software",
-            "model": "Zone Climate",
-        }
+class ZoneMetricSensor(SensorEntity):
+    """Diagnostic sensor exposing one of the zone's instrumentation metrics.
 
-    @property
-    def native_value(self):
-        """Return the current state of the sensor."""
-        return self._state
-
-    async def async_update(self):
-        """Fetch new state data for the sensor."""
-        # Check the room sensor first
-        if self._primary_sensor:
-            state = self.hass.states.get(self._primary_sensor)
-            if state and state.state not in ("unknown", "unavailable"):
-                self._state = "Room"
-                return
-
-        # Fallback to TRV sensors
-        for sensor in self._backup_sensors:
-            state = self.hass.states.get(sensor)
-            if state and state.state not in ("unknown", "unavailable"):
-                self._state = "TRV"
-                return
-
-        # If no valid sensors are available
-        self._state = None
-
-class ZoneHumiditySource(SensorEntity):
-    """Representation of the humidity source sensor."""
+    Disabled by default. Polled rather than pushed, so enabling it adds one
+    state write per scan interval instead of one per zone update.
+    """
 
-    def __init__(self, entry, name, unique_id):
-        """Initialize the humidity source sensor."""
-        self._entry = entry
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_should_poll = True
+
+    def __init__(self, coordinator, name, kind):
+        self.coordinator = coordinator
+        self._kind = kind
         self._attr_name = name
-        self._attr_unique_id = unique_id
-        self._primary_sensor = entry.data.get("zone_humidity_sensor")
-        self._backup_sensors = entry.data.get("trv_humidity_sensors", [])
-        self._state = None
+        self._attr_unique_id = f"{coordinator.zone_id}_{kind}"
+        if kind == "update_time":
+            self._attr_native_unit_of_measurement = "ms"
+            self._attr_state_class = SensorStateClass.MEASUREMENT
+        else:
+            self._attr_state_class = SensorStateClass.TOTAL_INCREASING
 
     @property
-    def device_info(self):
-        """Return device information for the sensor."""
-        return {
-            "identifiers": {(DOMAIN, self._entry.entry_id)},
-            "name": self._entry.data.get("zone_name"),
-            "manufacturer": "Zenntrix Software",
-            "model": "Zone Climate",
-        }
+    def native_value(self):
+        """Return the current metric value."""
+        metrics = self.coordinator.metrics
+        if self._kind == "events_handled":
+            return metrics.total_events
+        if self._kind == "state_writes":
+            return metrics.state_writes
+        stats = metrics.timings.get("handle_event")
+        return stats.as_dict()["mean_ms"] if stats else None
 
     @property
-    def native_value(self):
-        """Return the current state of the sensor."""
-        return self._state
-
-    async def async_update(self):
-        """Fetch new state data for the sensor."""
-        # Check the room sensor first
-        if self._primary_sensor:
-            state = self.hass.states.get(self._primary_sensor)
-            if state and state.state not in ("unknown", "unavailable"):
-                self._state = "Room"
-                return
-
-        # Fallback to TRV sensors
-        for sensor in self._backup_sensors:
-            state = self.hass.states.get(sensor)
-            if state and state.state not in ("unknown", "unavailable"):
-                self._state = "TRV"
-                return
-
-        # If no valid sensors are available
-        self._state = None
+    def device_info(self):
+        return {"identifiers": {(DOMAIN, self.coordinator.zone_id)}}
@@ -0,0 +1,14 @@
+"""The tested modules are plain Python, import them without Home Assistant."""
+import sys
+import types
+from pathlib import Path
+
+PACKAGE = Path(__file__).parents[1] / "custom_components" / "zone_climate"
+
+sys.path.insert(0, str(PACKAGE))
+
+# Modules with relative imports load from the package without running its
+# __init__, which needs Home Assistant
+package = types.ModuleType("zone_climate")
+package.__path__ = [str(PACKAGE)]
+sys.modules.setdefault("zone_climate", package)
@@ -0,0 +1,74 @@
+import random
+import statistics
+
+import pytest
+
+# The strategy names come from const.py, which imports Home Assistant
+pytest.importorskip("homeassistant")
+
+from zone_climate.aggregation import SensorGroup  # noqa: E402
+from zone_climate.const import AGGREGATIONS, AGGREGATION_WEIGHTED  # noqa: E402
+
+TRVS = [f"sensor.trv{i}" for i in range(6)]
+
+
+def _expected(aggregation, values, weights, trim_fraction):
+    """Compute the aggregate from scratch."""
+    if not values:
+        return None
+    if aggregation == AGGREGATION_WEIGHTED:
+        pairs = [
+            (value, weights.get(entity_id, 1.0)) for entity_id, value in values.items()
+        ]
+        total = sum(weight for _, weight in pairs)
+        if total > 0:
+            return sum(value * weight for value, weight in pairs) / total
+        aggregation = "mean"
+    ordered = sorted(values.values())
+    count = len(ordered)
+    if aggregation == "min":
+        return ordered[0]
+    if aggregation == "max":
+        return ordered[-1]
+    if aggregation == "median":
+        return statistics.median(ordered)
+    if aggregation == "trimmed_mean":
+        trim = int(count * trim_fraction)
+        kept = ordered[trim : count - trim] if count > 2 * trim else ordered
+        return sum(kept) / len(kept)
+    return sum(ordered) / count
+
+
+@pytest.mark.parametrize("aggregation", AGGREGATIONS)
+def test_matches_a_full_recomputation(aggregation):
+    rng = random.Random(aggregation)
+    weights = {entity_id: rng.choice((0.0, 0.5, 1.0, 2.0)) for entity_id in TRVS}
+    group = SensorGroup("sensor.room", TRVS, aggregation, weights, 0.25)
+    values = {}
+    for _ in range(2000):
+        entity_id = rng.choice(TRVS)
+        value = rng.choice((None, round(rng.uniform(15, 25), 1)))
+        group.update(entity_id, value)
+        if value is None:
+            values.pop(entity_id, None)
+        else:
+            values[entity_id] = value
+        expected = _expected(aggregation, values, weights, 0.25)
+        if expected is None:
+            assert group.trv_value is None
+        else:
+            assert group.trv_value == pytest.approx(expected)
+        assert group.trv_count == len(values)
+
+
+def test_room_sensor_wins_and_variation():
+    group = SensorGroup("sensor.room", TRVS[:2])
+    assert group.result() == (None, None, None)
+    assert group.update("sensor.trv0", 21.0)
+    assert not group.update("sensor.trv0", 21.0)
+    group.update("sensor.trv1", 23.0)
+    assert group.result() == (22.0, "TRV", None)
+    group.update("sensor.room", 19.5)
+    assert group.result() == (19.5, "Room", -2.5)
+    group.reset()
+    assert group.result() == (None, None, None)
@@ -0,0 +1,72 @@
+from controller import HysteresisController, PIDController
+
+
+def test_hysteresis_band():
+    controller = HysteresisController(1.0, 0, 0)
+    assert controller.update(19.4, 20, 0) is True
+    # Inside the band the last decision is kept
+    assert controller.update(20.2, 20, 60) is True
+    assert controller.update(20.5, 20, 120) is False
+    assert controller.update(19.8, 20, 180) is False
+    assert controller.update(19.5, 20, 240) is True
+    assert controller.cycles == 2
+
+
+def test_no_reading_fails_safe():
+    controller = HysteresisController(1.0, 0, 0)
+    assert controller.update(18, 20, 0) is True
+    assert controller.update(None, 20, 60) is False
+
+
+def test_minimum_on_and_off_times_hold():
+    controller = HysteresisController(1.0, 300, 600)
+    assert controller.update(18, 20, 0) is True
+    assert controller.update(22, 20, 100) is True
+    assert controller.update(22, 20, 300) is False
+    assert controller.update(18, 20, 600) is False
+    assert controller.update(18, 20, 900) is True
+
+
+def test_pid_output_follows_the_error():
+    controller = PIDController(0.5, 0, 0, 600, 0, 0)
+    controller.update(19, 20, 0)
+    assert controller.output == 0.5
+    controller.update(21, 20, 60)
+    assert controller.output == 0.0
+
+
+def test_pid_time_proportioned_cycle():
+    controller = PIDController(0.5, 0, 0, 600, 0, 0)
+    assert controller.update(19, 20, 0) is True
+    assert controller.update(19, 20, 290) is True
+    assert controller.update(19, 20, 310) is False
+    # The next cycle starts on again
+    assert controller.update(19, 20, 600) is True
+
+
+def test_pid_short_pulses_are_rounded():
+    controller = PIDController(0.05, 0, 0, 600, 60, 60)
+    # 5% of 600 s is shorter than the minimum on time
+    assert controller.update(19, 20, 0) is False
+
+
+def test_pid_anti_windup():
+    controller = PIDController(0.5, 0.1, 0, 600, 0, 0)
+    # Hours far below target keep the output saturated
+    for minute in range(600):
+        controller.update(15, 20, minute * 60)
+    assert controller.output == 1.0
+    # Without windup the output falls as soon as the target is passed
+    controller.update(20.5, 20, 600 * 60)
+    assert controller.output < 1.0
+    controller.update(21, 20, 601 * 60)
+    assert controller.output == 0.0
+
+
+def test_pid_restore_keeps_the_integral():
+    controller = PIDController(0.5, 0.1, 0, 600, 0, 0)
+    controller.update(19.5, 20, 0)
+    controller.update(19.5, 20, 600)
+    restored = PIDController(0.5, 0.1, 0, 600, 0, 0)
+    restored.restore(controller.as_dict())
+    assert restored.as_dict() == controller.as_dict()
@@ -0,0 +1,49 @@
+import random
+
+from freshness import TimerWheel
+
+
+def test_expires_once_the_deadline_has_passed():
+    wheel = TimerWheel(30, 128)
+    wheel.advance(1000)
+    wheel.schedule("a", 1010)
+    assert wheel.advance(1005) == []
+    assert wheel.advance(1035) == ["a"]
+    assert len(wheel) == 0
+
+
+def test_expires_within_two_ticks_of_the_deadline():
+    rng = random.Random(1)
+    for _ in range(200):
+        wheel = TimerWheel(30, 128)
+        start = rng.uniform(0, 100_000)
+        wheel.advance(start)
+        deadline = start + rng.uniform(1, 3600)
+        wheel.schedule("a", deadline)
+        now = start
+        while True:
+            now += 30
+            if wheel.advance(now):
+                break
+        # Due in the bucket of the tick after the deadline
+        assert deadline <= now < deadline + 60
+
+
+def test_cancel_and_reschedule():
+    wheel = TimerWheel(30, 128)
+    wheel.advance(0)
+    wheel.schedule("a", 40)
+    wheel.schedule("b", 40)
+    wheel.cancel("a")
+    wheel.schedule("b", 100)
+    assert wheel.advance(60) == []
+    assert wheel.advance(120) == ["b"]
+
+
+def test_deadline_beyond_one_lap():
+    wheel = TimerWheel(30, 4)
+    wheel.advance(0)
+    wheel.schedule("a", 200)
+    assert wheel.advance(90) == []
+    assert wheel.advance(120) == []
+    assert wheel.advance(210) == ["a"]
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from zone_climate.preheat import HeatRateEstimator, PreheatScheduler
+
+
+def test_learns_the_heat_up_rate():
+    estimator = HeatRateEstimator(60, 10, 5)
+    for i in range(100):
+        estimator.add(1000 + i * 0.5, 17 + 0.02 * i)
+    assert estimator.rate == pytest.approx(0.04)
+
+
+def test_needs_enough_samples_and_span():
+    estimator = HeatRateEstimator(60, 10, 5)
+    for i in range(9):
+        estimator.add(i, 17 + 0.1 * i)
+    assert estimator.rate is None
+
+    estimator = HeatRateEstimator(60, 10, 5)
+    for i in range(20):
+        estimator.add(i * 0.1, 17 + 0.01 * i)
+    # Enough samples, but only 1.9 minutes of them
+    assert estimator.rate is None
+
+
+def test_no_reading_ends_the_run_and_keeps_the_rate():
+    estimator = HeatRateEstimator(60, 10, 5)
+    for i in range(20):
+        estimator.add(i, 17 + 0.05 * i)
+    assert estimator.rate == pytest.approx(0.05)
+    estimator.add(20, None)
+    # A new run does not continue the old regression
+    for i in range(20):
+        estimator.add(30 + i, 25 - 0.05 * i)
+    assert estimator.rate == pytest.approx(0.05)
+
+
+def test_schedule_next_setpoint_and_lead_time():
+    scheduler = PreheatScheduler(
+        [
+            {"time": "22:00", "temperature": 16},
+            {"time": "06:30", "temperature": 21},
+            {"time": "not a time", "temperature": 20},
+        ],
+        120,
+    )
+    evening = datetime(2026, 1, 1, 23, 0, tzinfo=timezone.utc)
+    assert scheduler.next_setpoint(evening) == (
+        datetime(2026, 1, 2, 6, 30, tzinfo=timezone.utc),
+        21.0,
+    )
+    assert scheduler.lead_time(18, 21, 0.04) == timedelta(minutes=75)
+    assert scheduler.lead_time(18, 21, 0.001) == timedelta(minutes=120)
+    assert scheduler.lead_time(None, 21, 0.04) == timedelta()
+    assert scheduler.lead_time(22, 21, 0.04) == timedelta()
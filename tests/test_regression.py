@@ -0,0 +1,24 @@
+import pytest
+
+from regression import RunningRegression
+
+
+def test_slope_of_a_sliding_window():
+    fit = RunningRegression()
+    fit.reset(1_700_000_000)
+    samples = [(1_700_000_000 + 60 * i, 20 - 0.01 * i) for i in range(50)]
+    for x, y in samples[:10]:
+        fit.add(x, y)
+    for old, new in zip(samples, samples[10:]):
+        fit.remove(*old)
+        fit.add(*new)
+    assert fit.count == 10
+    assert fit.slope() == pytest.approx(-0.01 / 60)
+
+
+def test_slope_is_undefined_without_spread():
+    fit = RunningRegression()
+    assert fit.slope() is None
+    fit.add(5, 20)
+    fit.add(5, 21)
+    assert fit.slope() is None